@@ -74,11 +74,13 @@ class Interpreter:
         self.functions: Dict[str, FuncDeclNode] = {}
         self.output_buffer: List[str] = []
 
-    def interpret(self, ast: ProgramNode) -> List[str]:
-        errors = analyze(ast)
-        if errors:
-            error_messages = [str(error) for error in errors]
-            raise InterpreterError(f"Семантические ошибки:\n" + "\n".join(error_messages))
+    def interpret(self, ast: ProgramNode, analyzed: bool = False) -> List[str]:
+        # analyzed=True: вызывающий уже выполнил семантический анализ этого AST без ошибок
+        if not analyzed:
+            errors = analyze(ast)
+            if errors:
+                error_messages = [str(error) for error in errors]
+                raise InterpreterError(f"Семантические ошибки:\n" + "\n".join(error_messages))
 
         self.output_buffer = []
         try:
@@ -123,7 +125,7 @@ class Interpreter:
             return type_from_string(type_node.name)
         elif isinstance(type_node, ArrayTypeNode):
             element_type = self.get_type_from_node(type_node.element_type)
-            size = self.visit_expression(type_node.size)
+            size = type_node.size
             return ArrayType(element_type, size)
         else:
             raise InterpreterError(f"Неизвестный тип: {type(type_node)}")
@@ -445,9 +447,9 @@ class Interpreter:
             return True
 
 
-def interpret(ast: ProgramNode) -> List[str]:
+def interpret(ast: ProgramNode, analyzed: bool = False) -> List[str]:
     interpreter = Interpreter()
-    return interpreter.interpret(ast)
+    return interpreter.interpret(ast, analyzed)
 
 
 def run_program(ast: ProgramNode):
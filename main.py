@@ -1,7 +1,9 @@
 import argparse
+import contextlib
+import io
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -146,7 +148,7 @@ def cmd_vm(args):
         sys.exit(1)
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(
         description="Компилятор русскоязычного подмножества Pascal",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -186,7 +188,7 @@ def main():
     vm_parser.add_argument('input', help='Входной файл .avm')
     vm_parser.set_defaults(func=cmd_vm)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if not args.command:
         parser.print_help()
@@ -195,5 +197,20 @@ def main():
     args.func(args)
 
 
+def run_cli(argv: List[str]) -> Tuple[int, str]:
+    # Выполняет команду в текущем процессе и возвращает код выхода и перехваченный stdout
+    stdout = io.StringIO()
+    exit_code = 0
+    with contextlib.redirect_stdout(stdout):
+        try:
+            main(argv)
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                exit_code = e.code
+            elif e.code is not None:
+                exit_code = 1
+    return exit_code, stdout.getvalue()
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
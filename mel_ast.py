@@ -3,6 +3,8 @@ from abc import ABC, abstractmethod
 
 
 class SourcePosition:
+    __slots__ = ('line', 'column')
+
     def __init__(self, line: int, column: int):
         self.line = line
         self.column = column
@@ -12,6 +14,7 @@ class SourcePosition:
 
 
 class Node(ABC):
+    __slots__ = ('meta', 'type', 'const_value')
 
     def __init__(self, meta: Optional[SourcePosition] = None):
         self.meta = meta
@@ -41,6 +44,7 @@ class Node(ABC):
 
 
 class ProgramNode(Node):
+    __slots__ = ('name', 'block')
 
     def __init__(self, name: str, block: 'BlockNode', meta: Optional[SourcePosition] = None):
         super().__init__(meta)
@@ -54,6 +58,7 @@ class ProgramNode(Node):
 
 
 class BlockNode(Node):
+    __slots__ = ('var_decls', 'func_decls', 'statements')
 
     def __init__(self, var_decls: List['VarDeclNode'] = None,
                  func_decls: List['FuncDeclNode'] = None,
@@ -87,6 +92,7 @@ class BlockNode(Node):
 
 
 class VarDeclNode(Node):
+    __slots__ = ('name', 'var_type')
 
     def __init__(self, name: str, var_type: 'TypeNode', meta: Optional[SourcePosition] = None):
         super().__init__(meta)
@@ -100,6 +106,7 @@ class VarDeclNode(Node):
 
 
 class FuncDeclNode(Node):
+    __slots__ = ('name', 'params', 'return_type', 'block')
 
     def __init__(self, name: str, params: List['ParamNode'],
                  return_type: Optional['TypeNode'], block: BlockNode,
@@ -124,11 +131,13 @@ class FuncDeclNode(Node):
 
 
 class ParamNode(Node):
+    __slots__ = ('name', 'param_type', '_resolved_type')
 
     def __init__(self, name: str, param_type: 'TypeNode', meta: Optional[SourcePosition] = None):
         super().__init__(meta)
         self.name = name
         self.param_type = param_type
+        self._resolved_type = None
 
     def pretty(self, indent: int = 0) -> str:
         result = super().pretty(indent) + f"({self.name})\n"
@@ -139,10 +148,11 @@ class ParamNode(Node):
 
 
 class TypeNode(Node):
-    pass
+    __slots__ = ()
 
 
 class SimpleTypeNode(TypeNode):
+    __slots__ = ('name',)
 
     def __init__(self, name: str, meta: Optional[SourcePosition] = None):
         super().__init__(meta)
@@ -153,16 +163,16 @@ class SimpleTypeNode(TypeNode):
 
 
 class ArrayTypeNode(TypeNode):
+    __slots__ = ('size', 'element_type')
 
-    def __init__(self, size: 'ExpressionNode', element_type: TypeNode,
+    def __init__(self, size: int, element_type: TypeNode,
                  meta: Optional[SourcePosition] = None):
         super().__init__(meta)
         self.size = size
         self.element_type = element_type
 
     def pretty(self, indent: int = 0) -> str:
-        result = super().pretty(indent) + "\n"
-        result += self.size.pretty(indent + 1) + "\n"
+        result = super().pretty(indent) + f"[{self.size}]\n"
         result += self.element_type.pretty(indent + 1)
         return result
 
@@ -170,10 +180,11 @@ class ArrayTypeNode(TypeNode):
 
 
 class StatementNode(Node):
-    pass
+    __slots__ = ()
 
 
 class AssignNode(StatementNode):
+    __slots__ = ('target', 'value')
 
     def __init__(self, target: 'ExpressionNode', value: 'ExpressionNode',
                  meta: Optional[SourcePosition] = None):
@@ -189,6 +200,7 @@ class AssignNode(StatementNode):
 
 
 class IfNode(StatementNode):
+    __slots__ = ('condition', 'then_block', 'else_block')
 
     def __init__(self, condition: 'ExpressionNode', then_block: List[StatementNode],
                  else_block: Optional[List[StatementNode]] = None,
@@ -213,6 +225,7 @@ class IfNode(StatementNode):
 
 
 class ForNode(StatementNode):
+    __slots__ = ('var', 'start', 'end', 'step', 'body')
 
     def __init__(self, var: str, start: 'ExpressionNode', end: 'ExpressionNode',
                  step: Optional['ExpressionNode'] = None, body: List[StatementNode] = None,
@@ -239,6 +252,7 @@ class ForNode(StatementNode):
 
 
 class WhileNode(StatementNode):
+    __slots__ = ('condition', 'body')
 
     def __init__(self, condition: 'ExpressionNode', body: List[StatementNode],
                  meta: Optional[SourcePosition] = None):
@@ -257,6 +271,7 @@ class WhileNode(StatementNode):
 
 
 class DoWhileNode(StatementNode):
+    __slots__ = ('body', 'condition')
 
     def __init__(self, body: List[StatementNode], condition: 'ExpressionNode',
                  meta: Optional[SourcePosition] = None):
@@ -275,18 +290,21 @@ class DoWhileNode(StatementNode):
 
 
 class BreakNode(StatementNode):
+    __slots__ = ()
 
     def pretty(self, indent: int = 0) -> str:
         return super().pretty(indent)
 
 
 class ContinueNode(StatementNode):
+    __slots__ = ()
 
     def pretty(self, indent: int = 0) -> str:
         return super().pretty(indent)
 
 
 class ReturnNode(StatementNode):
+    __slots__ = ('value',)
 
     def __init__(self, value: Optional['ExpressionNode'] = None,
                  meta: Optional[SourcePosition] = None):
@@ -301,6 +319,7 @@ class ReturnNode(StatementNode):
 
 
 class CallStmtNode(StatementNode):
+    __slots__ = ('call',)
 
     def __init__(self, call: 'CallNode', meta: Optional[SourcePosition] = None):
         super().__init__(meta)
@@ -315,10 +334,11 @@ class CallStmtNode(StatementNode):
 
 
 class ExpressionNode(Node):
-    pass
+    __slots__ = ()
 
 
 class BinOpNode(ExpressionNode):
+    __slots__ = ('left', 'op', 'right')
 
     def __init__(self, left: ExpressionNode, op: str, right: ExpressionNode,
                  meta: Optional[SourcePosition] = None):
@@ -335,6 +355,7 @@ class BinOpNode(ExpressionNode):
 
 
 class UnaryOpNode(ExpressionNode):
+    __slots__ = ('op', 'operand')
 
     def __init__(self, op: str, operand: ExpressionNode,
                  meta: Optional[SourcePosition] = None):
@@ -349,6 +370,7 @@ class UnaryOpNode(ExpressionNode):
 
 
 class IdentifierNode(ExpressionNode):
+    __slots__ = ('name',)
 
     def __init__(self, name: str, meta: Optional[SourcePosition] = None):
         super().__init__(meta)
@@ -359,6 +381,7 @@ class IdentifierNode(ExpressionNode):
 
 
 class ArrayAccessNode(ExpressionNode):
+    __slots__ = ('array', 'index')
 
     def __init__(self, array: ExpressionNode, index: ExpressionNode,
                  meta: Optional[SourcePosition] = None):
@@ -374,6 +397,7 @@ class ArrayAccessNode(ExpressionNode):
 
 
 class CallNode(ExpressionNode):
+    __slots__ = ('name', 'args')
 
     def __init__(self, name: str, args: List[ExpressionNode],
                  meta: Optional[SourcePosition] = None):
@@ -396,6 +420,7 @@ class CallNode(ExpressionNode):
 
 
 class IntLiteralNode(ExpressionNode):
+    __slots__ = ('value',)
 
     def __init__(self, value: int, meta: Optional[SourcePosition] = None):
         super().__init__(meta)
@@ -406,6 +431,7 @@ class IntLiteralNode(ExpressionNode):
 
 
 class BoolLiteralNode(ExpressionNode):
+    __slots__ = ('value',)
 
     def __init__(self, value: bool, meta: Optional[SourcePosition] = None):
         super().__init__(meta)
@@ -416,6 +442,7 @@ class BoolLiteralNode(ExpressionNode):
 
 
 class CharLiteralNode(ExpressionNode):
+    __slots__ = ('value',)
 
     def __init__(self, value: str, meta: Optional[SourcePosition] = None):
         super().__init__(meta)
@@ -426,6 +453,7 @@ class CharLiteralNode(ExpressionNode):
 
 
 class StringLiteralNode(ExpressionNode):
+    __slots__ = ('value',)
 
     def __init__(self, value: str, meta: Optional[SourcePosition] = None):
         super().__init__(meta)
@@ -1,3 +1,7 @@
+import functools
+import os
+import pickle
+
 from lark import Lark, Transformer, Token, Tree
 from lark.exceptions import LarkError
 from typing import List, Optional, Any, Union
@@ -333,12 +337,13 @@ class MelASTBuilder(Transformer):
     def array_type(self, items):
         size_token, element_type = items[0], items[1]
 
+        # Размер сворачивается в число уже при разборе
         if isinstance(size_token, IntLiteralNode):
-            size_expr = size_token
+            size = size_token.value
         else:
 
-            size_expr = IntLiteralNode(value=int(size_token))
-        return ArrayTypeNode(size=size_expr, element_type=element_type)
+            size = int(size_token)
+        return ArrayTypeNode(size=size, element_type=element_type)
 
 
     def stmt_list(self, items):
@@ -670,17 +675,39 @@ class MelASTBuilder(Transformer):
 
 
 
-_parser = None
+# LALR-таблицы сохраняются между запусками; Lark сам перестраивает их при изменении грамматики
+_LARK_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.lark_cache')
+
+
+# LALR-таблицы строятся один раз на процесс для каждого стартового правила
+@functools.cache
+def _get_parser(start: str = 'program') -> Lark:
+    try:
+        os.makedirs(_LARK_CACHE_DIR, exist_ok=True)
+        cache = os.path.join(_LARK_CACHE_DIR, f'mel_{start}.pkl')
+    except OSError:
+        cache = False
+    return Lark(GRAMMAR, start=start, parser='lalr', cache=cache)
 
 
-def _get_parser():
-    global _parser
-    if _parser is None:
-        _parser = Lark(GRAMMAR, start='program', parser='lalr')
-    return _parser
+def reset_parser() -> None:
+    # Сбрасывает построенные парсеры без перезагрузки модуля; следующий разбор создаст их заново
+    _get_parser.cache_clear()
+    _parse_snapshot.cache_clear()
 
 
 def parse(source: str) -> ProgramNode:
+    # Анализ и оптимизации изменяют AST на месте: каждый вызов получает собственную копию
+    return pickle.loads(_parse_snapshot(source))
+
+
+# Повторный разбор того же исходника сводится к распаковке сохранённого снимка AST
+@functools.lru_cache(maxsize=128)
+def _parse_snapshot(source: str) -> bytes:
+    return pickle.dumps(_parse_uncached(source), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _parse_uncached(source: str) -> ProgramNode:
     try:
         parser = _get_parser()
         tree = parser.parse(source)
@@ -699,7 +726,7 @@ def parse(source: str) -> ProgramNode:
 def parse_expression(source: str) -> ExpressionNode:
     try:
 
-        expr_parser = Lark(GRAMMAR, start='expression', parser='lalr')
+        expr_parser = _get_parser('expression')
         tree = expr_parser.parse(source)
         transformer = MelASTBuilder()
         ast = transformer.transform(tree)
@@ -711,4 +738,4 @@ def parse_expression(source: str) -> ExpressionNode:
 
 
 
-__all__ = ['parse', 'parse_expression', 'ParseError', 'MelASTBuilder']
+__all__ = ['parse', 'parse_expression', 'ParseError', 'MelASTBuilder', 'reset_parser']
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Tuple, Any
 from dataclasses import dataclass
 
 
@@ -21,7 +21,17 @@ class Type(ABC):
         return self == other
 
 
-class IntegerType(Type):
+class _PrimitiveType(Type):
+
+    def __new__(cls):
+        instance = cls.__dict__.get('_instance')
+        if instance is None:
+            instance = super().__new__(cls)
+            cls._instance = instance
+        return instance
+
+
+class IntegerType(_PrimitiveType):
 
     def __str__(self) -> str:
         return "цел"
@@ -33,7 +43,7 @@ class IntegerType(Type):
         return hash("цел")
 
 
-class BooleanType(Type):
+class BooleanType(_PrimitiveType):
 
     def __str__(self) -> str:
         return "лог"
@@ -45,7 +55,7 @@ class BooleanType(Type):
         return hash("лог")
 
 
-class CharType(Type):
+class CharType(_PrimitiveType):
 
     def __str__(self) -> str:
         return "сим"
@@ -57,7 +67,7 @@ class CharType(Type):
         return hash("сим")
 
 
-class StringType(Type):
+class StringType(_PrimitiveType):
 
     def __str__(self) -> str:
         return "строка"
@@ -108,7 +118,7 @@ class FunctionType(Type):
         return hash(("алг", tuple(self.param_types), self.return_type))
 
 
-class VoidType(Type):
+class VoidType(_PrimitiveType):
 
     def __str__(self) -> str:
         return "пусто"
@@ -121,11 +131,25 @@ class VoidType(Type):
 
 
 
+class AnyType(_PrimitiveType):
+
+    def __str__(self) -> str:
+        return "любой"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, AnyType)
+
+    def __hash__(self) -> int:
+        return hash("любой")
+
+
+
 INTEGER = IntegerType()
 BOOLEAN = BooleanType()
 CHAR = CharType()
 STRING = StringType()
 VOID = VoidType()
+ANY = AnyType()
 
 
 
@@ -183,8 +207,27 @@ def get_unary_op_result_type(op: str, operand_type: Type) -> Optional[Type]:
     return None
 
 
+# Все допустимые сочетания операций над примитивными типами, вычисленные один раз
+_OPERAND_TYPES = (INTEGER, BOOLEAN, CHAR, STRING, VOID)
+
+BINARY_OP_RESULT_TYPES = {
+    (op, left_type, right_type): result_type
+    for op in ARITHMETIC_OPS | COMPARISON_OPS | LOGICAL_OPS
+    for left_type in _OPERAND_TYPES
+    for right_type in _OPERAND_TYPES
+    if (result_type := get_binary_op_result_type(op, left_type, right_type)) is not None
+}
+
+UNARY_OP_RESULT_TYPES = {
+    (op, operand_type): result_type
+    for op in UNARY_OPS
+    for operand_type in _OPERAND_TYPES
+    if (result_type := get_unary_op_result_type(op, operand_type)) is not None
+}
+
+
 def is_assignable(source: Type, target: Type) -> bool:
-    return source.is_compatible_with(target)
+    return target is ANY or source.is_compatible_with(target)
 
 
 def type_from_string(type_name: str) -> Optional[Type]:
@@ -198,6 +241,19 @@ def type_from_string(type_name: str) -> Optional[Type]:
     return type_map.get(type_name)
 
 
+_function_type_cache: Dict[Tuple[Tuple[Type, ...], Optional[Type]], FunctionType] = {}
+
+
+def make_function_type(param_types: List[Type], return_type: Optional[Type]) -> FunctionType:
+    # Одинаковые сигнатуры разделяют один объект FunctionType
+    key = (tuple(param_types), return_type)
+    func_type = _function_type_cache.get(key)
+    if func_type is None:
+        func_type = FunctionType(list(param_types), return_type)
+        _function_type_cache[key] = func_type
+    return func_type
+
+
 def get_default_value(type_obj: Type) -> Any:
     if type_obj == INTEGER:
         return 0
@@ -220,7 +276,7 @@ def get_default_value(type_obj: Type) -> Any:
 
 BUILTIN_FUNCTIONS = {
 
-    'вывод': None,
+    'вывод': FunctionType([ANY], VOID),
     'выводстр': FunctionType([STRING], VOID),
     'ввод': FunctionType([INTEGER], VOID),
     'вводстр': FunctionType([STRING], VOID),
@@ -247,10 +303,11 @@ def is_builtin_function(name: str) -> bool:
 
 __all__ = [
     'Type', 'IntegerType', 'BooleanType', 'CharType', 'StringType',
-    'ArrayType', 'FunctionType', 'VoidType',
-    'INTEGER', 'BOOLEAN', 'CHAR', 'STRING', 'VOID',
+    'ArrayType', 'FunctionType', 'VoidType', 'AnyType',
+    'INTEGER', 'BOOLEAN', 'CHAR', 'STRING', 'VOID', 'ANY',
     'ARITHMETIC_OPS', 'COMPARISON_OPS', 'LOGICAL_OPS', 'UNARY_OPS',
     'get_binary_op_result_type', 'get_unary_op_result_type',
-    'is_assignable', 'type_from_string', 'get_default_value',
+    'BINARY_OP_RESULT_TYPES', 'UNARY_OP_RESULT_TYPES',
+    'is_assignable', 'type_from_string', 'make_function_type', 'get_default_value',
     'get_builtin_function_type', 'is_builtin_function', 'BUILTIN_FUNCTIONS'
 ]
@@ -254,6 +254,8 @@ class ConstantFolder:
             return node
 
     def visit_bin_op(self, node: BinOpNode) -> ExpressionNode:
+        if node.const_value is not None:
+            return self.fold_analyzed_constant(node)
 
         optimized_left = self.visit_expression(node.left)
         optimized_right = self.visit_expression(node.right)
@@ -279,6 +281,9 @@ class ConstantFolder:
         return BinOpNode(optimized_left, node.op, optimized_right, node.meta)
 
     def visit_unary_op(self, node: UnaryOpNode) -> ExpressionNode:
+        if node.const_value is not None:
+            return self.fold_analyzed_constant(node)
+
         optimized_operand = self.visit_expression(node.operand)
 
 
@@ -308,6 +313,22 @@ class ConstantFolder:
 
 
 
+    def fold_analyzed_constant(self, node: ExpressionNode) -> ExpressionNode:
+        # Значение уже вычислено семантическим анализом: поддерево не обходим повторно,
+        # но учитываем каждую свёрнутую операцию, как при обычной свёртке
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, BinOpNode):
+                self.optimizations_count += 1
+                stack.append(current.left)
+                stack.append(current.right)
+            elif isinstance(current, UnaryOpNode):
+                self.optimizations_count += 1
+                stack.append(current.operand)
+
+        return self.create_constant_node(node.const_value)
+
     def is_constant(self, node: ExpressionNode) -> bool:
         return isinstance(node, (IntLiteralNode, BoolLiteralNode, CharLiteralNode, StringLiteralNode))
 
@@ -630,12 +651,14 @@ class PeepholeOptimizer:
         }
 
 
-def optimize_ast(ast: ProgramNode, enable_constant_folding: bool = True) -> tuple[ProgramNode, dict]:
+def optimize_ast(ast: ProgramNode, enable_constant_folding: bool = True,
+                 folder: Optional[ConstantFolder] = None) -> tuple[ProgramNode, dict]:
     optimized_ast = ast
     stats = {}
 
     if enable_constant_folding:
-        folder = ConstantFolder()
+        if folder is None:
+            folder = ConstantFolder()
         optimized_ast = folder.optimize(optimized_ast)
         stats.update(folder.get_stats())
 
@@ -5,6 +5,8 @@ from mel_ast import SourcePosition
 
 
 class SemanticError(Exception):
+    __slots__ = ('message', 'position')
+
     def __init__(self, message: str, position: Optional[SourcePosition] = None):
         self.message = message
         self.position = position
@@ -16,7 +18,7 @@ class SemanticError(Exception):
         return f"Семантическая ошибка: {self.message}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Symbol:
     name: str
     symbol_type: Type
@@ -44,12 +46,13 @@ class Scope:
             parent.children.append(self)
 
     def declare(self, name: str, symbol: Symbol) -> None:
+        error = self.declare_nothrow(name, symbol)
+        if error is not None:
+            raise SemanticError(error, symbol.position)
+
+    def declare_nothrow(self, name: str, symbol: Symbol) -> Optional[str]:
         if name in self.symbols:
-            existing = self.symbols[name]
-            raise SemanticError(
-                f"Символ '{name}' уже объявлен в этой области видимости",
-                symbol.position
-            )
+            return f"Символ '{name}' уже объявлен в этой области видимости"
 
 
         if symbol.category == 'var' and not symbol.is_global:
@@ -57,6 +60,7 @@ class Scope:
             self.local_count += 1
 
         self.symbols[name] = symbol
+        return None
 
     def lookup(self, name: str) -> Optional[Symbol]:
         if name in self.symbols:
@@ -130,6 +134,13 @@ class ScopeManager:
     def declare(self, name: str, symbol: Symbol) -> None:
         self.current_scope.declare(name, symbol)
 
+    def declare_nothrow(self, name: str, symbol: Symbol) -> Optional[str]:
+        return self.current_scope.declare_nothrow(name, symbol)
+
+    def declare_params(self, symbols: List[Symbol]) -> List[Optional[str]]:
+        declare = self.current_scope.declare_nothrow
+        return [declare(symbol.name, symbol) for symbol in symbols]
+
     def lookup(self, name: str) -> Optional[Symbol]:
         return self.current_scope.lookup(name)
 
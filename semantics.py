@@ -1,21 +1,26 @@
 
+import operator
 from typing import Optional, List, Dict, Any
 from mel_ast import *
 from mel_types import *
 from scope import *
 
 
+_LOOP_TYPES = (ForNode, WhileNode, DoWhileNode)
+
+
 class SemanticAnalyzer:
+    __slots__ = ('scope_manager', 'errors', 'current_function', 'const_nodes')
 
     def __init__(self):
-        self.scope_manager = create_scope_manager_with_builtins()
+        self.scope_manager: ScopeManager = create_scope_manager_with_builtins()
         self.errors: List[SemanticError] = []
         self.current_function: Optional[FuncDeclNode] = None
+        self.const_nodes: List[ExpressionNode] = []
 
     def analyze(self, ast: ProgramNode) -> List[SemanticError]:
-        self.errors = []
         try:
-            self.visit_program(ast)
+            self.analyze_core(ast)
         except Exception as e:
 
             if not isinstance(e, SemanticError):
@@ -23,12 +28,19 @@ class SemanticAnalyzer:
 
         return self.errors
 
-    def add_error(self, message: str, position: Optional[SourcePosition] = None):
+    def analyze_core(self, ast: ProgramNode) -> List[SemanticError]:
+        # Без перехвата исключений: внутренние ошибки анализатора пробрасываются вызывающему
+        self.errors = []
+        self.const_nodes = []
+        self.visit_program(ast)
+        return self.errors
+
+    def add_error(self, message: str, position: Optional[SourcePosition] = None) -> None:
         self.errors.append(SemanticError(message, position))
 
 
 
-    def visit_program(self, node: ProgramNode):
+    def visit_program(self, node: ProgramNode) -> None:
 
         self.scope_manager.enter_scope(f"program_{node.name}")
 
@@ -38,25 +50,30 @@ class SemanticAnalyzer:
         finally:
             self.scope_manager.exit_scope()
 
-    def visit_block(self, node: BlockNode):
-
-
-        for var_decl in node.var_decls:
-            self.visit_var_decl(var_decl)
-
-
-        for func_decl in node.func_decls:
-            self.declare_function_signature(func_decl)
+    def visit_block(self, node: BlockNode) -> None:
+        var_decls = node.var_decls
+        func_decls = node.func_decls
+        statements = node.statements
 
+        visit_var_decl = self.visit_var_decl
+        for var_decl in var_decls:
+            visit_var_decl(var_decl)
 
-        for func_decl in node.func_decls:
-            self.visit_func_decl(func_decl)
+        # Сигнатуры объявляются до тел, чтобы работали прямые ссылки между функциями
+        if func_decls:
+            declare_signature = self.declare_function_signature
+            for func_decl in func_decls:
+                declare_signature(func_decl)
 
+            visit_func_decl = self.visit_func_decl
+            for func_decl in func_decls:
+                visit_func_decl(func_decl)
 
-        for stmt in node.statements:
-            self.visit_statement(stmt)
+        visit_statement = self.visit_statement
+        for stmt in statements:
+            visit_statement(stmt)
 
-    def visit_var_decl(self, node: VarDeclNode):
+    def visit_var_decl(self, node: VarDeclNode) -> None:
 
         var_type = self.visit_type(node.var_type)
         if var_type is None:
@@ -72,13 +89,13 @@ class SemanticAnalyzer:
             is_global=self.scope_manager.is_in_global_scope()
         )
 
-        try:
-            self.scope_manager.declare(node.name, symbol)
+        error = self.scope_manager.declare_nothrow(node.name, symbol)
+        if error is None:
             node.type = var_type
-        except SemanticError as e:
-            self.add_error(e.message, node.meta)
+        else:
+            self.add_error(error, node.meta)
 
-    def declare_function_signature(self, node: FuncDeclNode):
+    def declare_function_signature(self, node: FuncDeclNode) -> None:
 
         param_types = []
         for param in node.params:
@@ -86,6 +103,7 @@ class SemanticAnalyzer:
             if param_type is None:
                 self.add_error(f"Неизвестный тип параметра '{param.name}'", param.meta)
                 return
+            param._resolved_type = param_type
             param_types.append(param_type)
 
 
@@ -97,7 +115,7 @@ class SemanticAnalyzer:
                 return
 
 
-        func_type = FunctionType(param_types, return_type)
+        func_type = make_function_type(param_types, return_type)
 
 
         symbol = Symbol(
@@ -108,13 +126,13 @@ class SemanticAnalyzer:
             is_global=True
         )
 
-        try:
-            self.scope_manager.declare(node.name, symbol)
+        error = self.scope_manager.declare_nothrow(node.name, symbol)
+        if error is None:
             node.type = func_type
-        except SemanticError as e:
-            self.add_error(e.message, node.meta)
+        else:
+            self.add_error(error, node.meta)
 
-    def visit_func_decl(self, node: FuncDeclNode):
+    def visit_func_decl(self, node: FuncDeclNode) -> None:
 
         old_function = self.current_function
         self.current_function = node
@@ -123,20 +141,28 @@ class SemanticAnalyzer:
 
         try:
 
+            params = []
+            symbols = []
             for param in node.params:
-                param_type = self.visit_type(param.param_type)
+                # Тип уже вычислен при объявлении сигнатуры, если она разобрана без ошибок
+                param_type = param._resolved_type
+                if param_type is None:
+                    param_type = self.visit_type(param.param_type)
                 if param_type:
-                    symbol = Symbol(
+                    params.append(param)
+                    symbols.append(Symbol(
                         name=param.name,
                         symbol_type=param_type,
                         category='param',
                         position=param.meta
-                    )
-                    try:
-                        self.scope_manager.declare(param.name, symbol)
-                        param.type = param_type
-                    except SemanticError as e:
-                        self.add_error(e.message, param.meta)
+                    ))
+
+            errors = self.scope_manager.declare_params(symbols)
+            for param, symbol, error in zip(params, symbols, errors):
+                if error is None:
+                    param.type = symbol.symbol_type
+                else:
+                    self.add_error(error, param.meta)
 
 
             self.visit_block(node.block)
@@ -150,9 +176,18 @@ class SemanticAnalyzer:
             self.current_function = old_function
 
     def has_return_statement(self, block: BlockNode) -> bool:
-        for stmt in block.statements:
-            if isinstance(stmt, ReturnNode):
+        stack = list(block.statements)
+        while stack:
+            stmt = stack.pop()
+            stmt_class = type(stmt)
+            if stmt_class is ReturnNode:
                 return True
+            elif stmt_class is IfNode:
+                stack.extend(stmt.then_block)
+                if stmt.else_block:
+                    stack.extend(stmt.else_block)
+            elif stmt_class in _LOOP_TYPES:
+                stack.extend(stmt.body)
 
         return False
 
@@ -165,15 +200,13 @@ class SemanticAnalyzer:
                 return None
 
 
-            size_value = None
-            if isinstance(node.size, IntLiteralNode):
-                size_value = node.size.value
-                if size_value <= 0:
-                    self.add_error(f"Размер массива должен быть положительным числом", node.meta)
-                    return None
-            else:
+            size_value = node.size
+            if not isinstance(size_value, int):
                 self.add_error(f"Размер массива должен быть константой", node.meta)
                 return None
+            if size_value <= 0:
+                self.add_error(f"Размер массива должен быть положительным числом", node.meta)
+                return None
 
             return ArrayType(element_type, size_value)
 
@@ -181,7 +214,7 @@ class SemanticAnalyzer:
 
 
 
-    def visit_statement(self, node: StatementNode):
+    def visit_statement(self, node: StatementNode) -> None:
         if isinstance(node, AssignNode):
             self.visit_assign(node)
         elif isinstance(node, IfNode):
@@ -201,9 +234,9 @@ class SemanticAnalyzer:
         elif isinstance(node, CallStmtNode):
             self.visit_call_stmt(node)
         else:
-            self.add_error(f"Неизвестный тип оператора: {type(node)}", getattr(node, 'meta', None))
+            self.add_error(f"Неизвестный тип оператора: {type(node)}", node.meta)
 
-    def visit_assign(self, node: AssignNode):
+    def visit_assign(self, node: AssignNode) -> None:
 
         target_type = self.visit_expression(node.target)
 
@@ -220,27 +253,27 @@ class SemanticAnalyzer:
 
         node.type = VOID
 
-    def visit_if(self, node: IfNode):
+    def visit_if(self, node: IfNode) -> None:
 
         condition_type = self.visit_expression(node.condition)
-        if condition_type and condition_type != BOOLEAN:
+        if condition_type and condition_type is not BOOLEAN:
             self.add_error(f"Условие должно быть логического типа, получен {condition_type}", node.meta)
 
-
+        visit_statement = self.visit_statement
         for stmt in node.then_block:
-            self.visit_statement(stmt)
+            visit_statement(stmt)
 
         if node.else_block:
             for stmt in node.else_block:
-                self.visit_statement(stmt)
+                visit_statement(stmt)
 
         node.type = VOID
 
-    def visit_for(self, node: ForNode):
+    def visit_for(self, node: ForNode) -> None:
 
         try:
             var_symbol = self.scope_manager.resolve(node.var, node.meta)
-            if var_symbol.symbol_type != INTEGER:
+            if var_symbol.symbol_type is not INTEGER:
                 self.add_error(f"Переменная цикла '{node.var}' должна быть целого типа", node.meta)
         except SemanticError as e:
             self.add_error(e.message, node.meta)
@@ -249,56 +282,56 @@ class SemanticAnalyzer:
         start_type = self.visit_expression(node.start)
         end_type = self.visit_expression(node.end)
 
-        if start_type and start_type != INTEGER:
+        if start_type and start_type is not INTEGER:
             self.add_error(f"Начальное значение цикла должно быть целого типа", node.meta)
-        if end_type and end_type != INTEGER:
+        if end_type and end_type is not INTEGER:
             self.add_error(f"Конечное значение цикла должно быть целого типа", node.meta)
 
 
         if node.step:
             step_type = self.visit_expression(node.step)
-            if step_type and step_type != INTEGER:
+            if step_type and step_type is not INTEGER:
                 self.add_error(f"Шаг цикла должен быть целого типа", node.meta)
 
-
+        visit_statement = self.visit_statement
         for stmt in node.body:
-            self.visit_statement(stmt)
+            visit_statement(stmt)
 
         node.type = VOID
 
-    def visit_while(self, node: WhileNode):
+    def visit_while(self, node: WhileNode) -> None:
 
         condition_type = self.visit_expression(node.condition)
-        if condition_type and condition_type != BOOLEAN:
+        if condition_type and condition_type is not BOOLEAN:
             self.add_error(f"Условие цикла должно быть логического типа", node.meta)
 
-
+        visit_statement = self.visit_statement
         for stmt in node.body:
-            self.visit_statement(stmt)
+            visit_statement(stmt)
 
         node.type = VOID
 
-    def visit_do_while(self, node: DoWhileNode):
-
+    def visit_do_while(self, node: DoWhileNode) -> None:
+        visit_statement = self.visit_statement
         for stmt in node.body:
-            self.visit_statement(stmt)
+            visit_statement(stmt)
 
 
         condition_type = self.visit_expression(node.condition)
-        if condition_type and condition_type != BOOLEAN:
+        if condition_type and condition_type is not BOOLEAN:
             self.add_error(f"Условие цикла должно быть логического типа", node.meta)
 
         node.type = VOID
 
-    def visit_break(self, node: BreakNode):
+    def visit_break(self, node: BreakNode) -> None:
 
         node.type = VOID
 
-    def visit_continue(self, node: ContinueNode):
+    def visit_continue(self, node: ContinueNode) -> None:
 
         node.type = VOID
 
-    def visit_return(self, node: ReturnNode):
+    def visit_return(self, node: ReturnNode) -> None:
         if not self.current_function:
             self.add_error("Оператор 'знач' может использоваться только внутри функции", node.meta)
             return
@@ -314,7 +347,7 @@ class SemanticAnalyzer:
 
             actual_type = self.visit_expression(node.value)
             if actual_type and expected_type:
-                if expected_type == VOID:
+                if expected_type is VOID:
                     self.add_error("Процедура не может возвращать значение", node.meta)
                 elif not is_assignable(actual_type, expected_type):
                     self.add_error(
@@ -323,16 +356,16 @@ class SemanticAnalyzer:
                     )
         else:
 
-            if expected_type and expected_type != VOID:
+            if expected_type and expected_type is not VOID:
                 self.add_error(f"Функция должна возвращать значение типа {expected_type}", node.meta)
 
         node.type = VOID
 
-    def visit_call_stmt(self, node: CallStmtNode):
-        call_type = self.visit_call_expr(node.call)
+    def visit_call_stmt(self, node: CallStmtNode) -> None:
+        call_type = self.visit_expression(node.call)
 
 
-        if call_type and call_type != VOID:
+        if call_type and call_type is not VOID:
             self.add_error("Результат функции не используется", node.meta)
 
         node.type = VOID
@@ -340,36 +373,68 @@ class SemanticAnalyzer:
 
 
     def visit_expression(self, node: ExpressionNode) -> Optional[Type]:
-        if isinstance(node, BinOpNode):
-            return self.visit_bin_op(node)
-        elif isinstance(node, UnaryOpNode):
-            return self.visit_unary_op(node)
-        elif isinstance(node, IdentifierNode):
-            return self.visit_identifier(node)
-        elif isinstance(node, ArrayAccessNode):
-            return self.visit_array_access(node)
-        elif isinstance(node, CallNode):
-            return self.visit_call_expr(node)
-        elif isinstance(node, IntLiteralNode):
-            return self.visit_int_literal(node)
-        elif isinstance(node, BoolLiteralNode):
-            return self.visit_bool_literal(node)
-        elif isinstance(node, CharLiteralNode):
-            return self.visit_char_literal(node)
-        elif isinstance(node, StringLiteralNode):
-            return self.visit_string_literal(node)
-        else:
-            self.add_error(f"Неизвестный тип выражения: {type(node)}", getattr(node, 'meta', None))
-            return None
+        # Обход в обратном порядке на явном стеке: глубина выражения не ограничена стеком вызовов
+        results: List[Optional[Type]] = []
+        work = [(_ENTER, node, None)]
+        pop = work.pop
+        push = work.append
+
+        while work:
+            action, current, data = pop()
+
+            if action is _ENTER:
+                # Поддерево уже типизировано без ошибок при прошлом анализе
+                cached_type = current.type
+                if cached_type is not None:
+                    results.append(cached_type)
+                    continue
+
+                node_class = type(current)
+                children = _EXPRESSION_CHILDREN.get(node_class)
+                if children is not None:
+                    operands = children(current)
+                    push((_EXIT, current, len(operands)))
+                    for operand in reversed(operands):
+                        push((_ENTER, operand, None))
+                elif node_class is CallNode:
+                    func_type = self.resolve_call(current)
+                    if func_type is None:
+                        results.append(None)
+                    else:
+                        push((_EXIT, current, (func_type, len(self.errors))))
+                        args = current.args
+                        for index in range(len(args) - 1, -1, -1):
+                            push((_CHECK_ARG, current, (index, func_type)))
+                            push((_ENTER, args[index], None))
+                else:
+                    leaf = _EXPRESSION_LEAVES.get(node_class)
+                    if leaf is None:
+                        self.add_error(f"Неизвестный тип выражения: {type(current)}", current.meta)
+                        results.append(None)
+                    else:
+                        results.append(leaf(self, current))
+
+            elif action is _CHECK_ARG:
+                index, func_type = data
+                self.check_call_argument(current, index, results.pop(), func_type.param_types[index])
+
+            elif type(current) is CallNode:
+                func_type, error_count = data
+                results.append(self.visit_call_expr(current, func_type, error_count))
+
+            else:
+                operand_types = results[-data:]
+                del results[-data:]
+                results.append(_EXPRESSION_COMBINERS[type(current)](self, current, *operand_types))
 
-    def visit_bin_op(self, node: BinOpNode) -> Optional[Type]:
-        left_type = self.visit_expression(node.left)
-        right_type = self.visit_expression(node.right)
+        return results[0]
 
+    def visit_bin_op(self, node: BinOpNode, left_type: Optional[Type],
+                     right_type: Optional[Type]) -> Optional[Type]:
         if left_type is None or right_type is None:
             return None
 
-        result_type = get_binary_op_result_type(node.op, left_type, right_type)
+        result_type = BINARY_OP_RESULT_TYPES.get((node.op, left_type, right_type))
         if result_type is None:
             self.add_error(
                 f"Недопустимая операция '{node.op}' для типов {left_type} и {right_type}",
@@ -378,15 +443,22 @@ class SemanticAnalyzer:
             return None
 
         node.type = result_type
-        return result_type
 
-    def visit_unary_op(self, node: UnaryOpNode) -> Optional[Type]:
-        operand_type = self.visit_expression(node.operand)
+        # Свёртка констант попутно с проверкой типов
+        left_value = node.left.const_value
+        right_value = node.right.const_value
+        if left_value is not None and right_value is not None:
+            if node.op not in _ZERO_CHECKED_OPS or right_value != 0:
+                node.const_value = _CONST_BINARY_OPS[node.op](left_value, right_value)
+                self.const_nodes.append(node)
+
+        return result_type
 
+    def visit_unary_op(self, node: UnaryOpNode, operand_type: Optional[Type]) -> Optional[Type]:
         if operand_type is None:
             return None
 
-        result_type = get_unary_op_result_type(node.op, operand_type)
+        result_type = UNARY_OP_RESULT_TYPES.get((node.op, operand_type))
         if result_type is None:
             self.add_error(
                 f"Недопустимая унарная операция '{node.op}' для типа {operand_type}",
@@ -395,24 +467,33 @@ class SemanticAnalyzer:
             return None
 
         node.type = result_type
+
+        operand_value = node.operand.const_value
+        if operand_value is not None:
+            node.const_value = _CONST_UNARY_OPS[node.op](operand_value)
+            self.const_nodes.append(node)
+
         return result_type
 
     def visit_identifier(self, node: IdentifierNode) -> Optional[Type]:
-        try:
-            symbol = self.scope_manager.resolve(node.name, node.meta)
-            node.type = symbol.symbol_type
-            return symbol.symbol_type
-        except SemanticError as e:
-            self.add_error(e.message, node.meta)
-            return None
-
-    def visit_array_access(self, node: ArrayAccessNode) -> Optional[Type]:
-        array_type = self.visit_expression(node.array)
-        index_type = self.visit_expression(node.index)
+        # Сначала текущая область: обход цепочки областей только при промахе
+        symbol = self.scope_manager.current_scope.symbols.get(node.name)
+        if symbol is None:
+            try:
+                symbol = self.scope_manager.resolve(node.name, node.meta)
+            except SemanticError as e:
+                self.add_error(e.message, node.meta)
+                return None
 
+        node.type = symbol.symbol_type
+        return symbol.symbol_type
 
-        if index_type and index_type != INTEGER:
+    def visit_array_access(self, node: ArrayAccessNode, array_type: Optional[Type],
+                           index_type: Optional[Type]) -> Optional[Type]:
+        index_valid = True
+        if index_type and index_type is not INTEGER:
             self.add_error(f"Индекс массива должен быть целого типа", node.meta)
+            index_valid = False
 
 
         if array_type:
@@ -420,57 +501,48 @@ class SemanticAnalyzer:
                 self.add_error(f"Попытка индексации не-массива", node.meta)
                 return None
 
-            node.type = array_type.element_type
+            if index_valid and index_type is not None:
+                node.type = array_type.element_type
             return array_type.element_type
 
         return None
 
-    def visit_call_expr(self, node: CallNode) -> Optional[Type]:
-
-        if node.name == "вывод":
-            if len(node.args) != 1:
-                self.add_error(f"Функция 'вывод' ожидает 1 аргумент, получено {len(node.args)}", node.meta)
-                return None
-
-
-            self.visit_expression(node.args[0])
-            node.type = VOID
-            return VOID
-
+    def resolve_call(self, node: CallNode) -> Optional[FunctionType]:
         try:
             symbol = self.scope_manager.resolve(node.name, node.meta)
+        except SemanticError as e:
+            self.add_error(e.message, node.meta)
+            return None
 
-            if not isinstance(symbol.symbol_type, FunctionType):
-                self.add_error(f"'{node.name}' не является функцией", node.meta)
-                return None
-
-            func_type = symbol.symbol_type
+        if not isinstance(symbol.symbol_type, FunctionType):
+            self.add_error(f"'{node.name}' не является функцией", node.meta)
+            return None
 
+        func_type = symbol.symbol_type
 
-            if len(node.args) != len(func_type.param_types):
-                self.add_error(
-                    f"Функция '{node.name}' ожидает {len(func_type.param_types)} аргументов, получено {len(node.args)}",
-                    node.meta
-                )
-                return None
 
+        if len(node.args) != len(func_type.param_types):
+            self.add_error(
+                f"Функция '{node.name}' ожидает {len(func_type.param_types)} аргументов, получено {len(node.args)}",
+                node.meta
+            )
+            return None
 
-            for i, (arg, expected_type) in enumerate(zip(node.args, func_type.param_types)):
-                actual_type = self.visit_expression(arg)
-                if actual_type and not is_assignable(actual_type, expected_type):
-                    self.add_error(
-                        f"Аргумент {i+1} функции '{node.name}': ожидается {expected_type}, получен {actual_type}",
-                        node.meta
-                    )
+        return func_type
 
+    def check_call_argument(self, node: CallNode, index: int, actual_type: Optional[Type],
+                            expected_type: Type) -> None:
+        if actual_type and not is_assignable(actual_type, expected_type):
+            self.add_error(
+                f"Аргумент {index+1} функции '{node.name}': ожидается {expected_type}, получен {actual_type}",
+                node.meta
+            )
 
-            return_type = func_type.return_type or VOID
+    def visit_call_expr(self, node: CallNode, func_type: FunctionType, error_count: int) -> Type:
+        return_type = func_type.return_type or VOID
+        if len(self.errors) == error_count:
             node.type = return_type
-            return return_type
-
-        except SemanticError as e:
-            self.add_error(e.message, node.meta)
-            return None
+        return return_type
 
 
 
@@ -495,11 +567,66 @@ class SemanticAnalyzer:
         return STRING
 
 
+_CONST_BINARY_OPS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.floordiv,
+    'div': operator.floordiv,
+    'mod': operator.mod,
+    '=': operator.eq,
+    '<>': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'и': lambda left, right: bool(left) and bool(right),
+    'или': lambda left, right: bool(left) or bool(right),
+}
+
+_ZERO_CHECKED_OPS = {'/', 'div', 'mod'}
+
+_CONST_UNARY_OPS = {
+    '-': operator.neg,
+    '+': lambda operand: operand,
+    'не': lambda operand: not bool(operand),
+}
+
+_ENTER = 0
+_CHECK_ARG = 1
+_EXIT = 2
+
+_EXPRESSION_CHILDREN = {
+    BinOpNode: lambda node: (node.left, node.right),
+    UnaryOpNode: lambda node: (node.operand,),
+    ArrayAccessNode: lambda node: (node.array, node.index),
+}
+
+_EXPRESSION_COMBINERS = {
+    BinOpNode: SemanticAnalyzer.visit_bin_op,
+    UnaryOpNode: SemanticAnalyzer.visit_unary_op,
+    ArrayAccessNode: SemanticAnalyzer.visit_array_access,
+}
+
+_EXPRESSION_LEAVES = {
+    IdentifierNode: SemanticAnalyzer.visit_identifier,
+    IntLiteralNode: SemanticAnalyzer.visit_int_literal,
+    BoolLiteralNode: SemanticAnalyzer.visit_bool_literal,
+    CharLiteralNode: SemanticAnalyzer.visit_char_literal,
+    StringLiteralNode: SemanticAnalyzer.visit_string_literal,
+}
+
+
 def analyze(ast: ProgramNode) -> List[SemanticError]:
     analyzer = SemanticAnalyzer()
     return analyzer.analyze(ast)
 
 
+def analyze_core(ast: ProgramNode) -> List[SemanticError]:
+    analyzer = SemanticAnalyzer()
+    return analyzer.analyze_core(ast)
+
+
 def check_semantics(ast: ProgramNode) -> bool:
     errors = analyze(ast)
     if errors:
@@ -510,4 +637,4 @@ def check_semantics(ast: ProgramNode) -> bool:
 
 
 
-__all__ = ['SemanticAnalyzer', 'analyze', 'check_semantics']
+__all__ = ['SemanticAnalyzer', 'analyze', 'analyze_core', 'check_semantics']
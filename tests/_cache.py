@@ -0,0 +1,119 @@
+import atexit
+import hashlib
+import os
+import pickle
+from functools import lru_cache
+
+import mel_ast
+import mel_parser
+from mel_parser import parse
+from optim import optimize_ast, optimize_bytecode
+from vm_codegen import compile_to_vm
+
+
+# Разобранные AST сохраняются между запусками: ключ - sha256 исходника,
+# весь кэш сбрасывается при изменении парсера или узлов AST
+_AST_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.ast_cache.pkl')
+_AST_CACHE_VERSION = (os.path.getmtime(mel_parser.__file__), os.path.getmtime(mel_ast.__file__))
+
+_ast_cache = {}
+_new_asts = {}
+
+
+def _load_ast_cache() -> None:
+    try:
+        with open(_AST_CACHE_PATH, 'rb') as f:
+            version, entries = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, ValueError, AttributeError, ImportError):
+        return
+    if version == _AST_CACHE_VERSION:
+        _ast_cache.update(entries)
+
+
+def _save_ast_cache() -> None:
+    if not _new_asts:
+        return
+    tmp_path = f"{_AST_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((_AST_CACHE_VERSION, _ast_cache), f, protocol=5)
+        os.replace(tmp_path, _AST_CACHE_PATH)
+    except OSError:
+        pass
+
+
+_load_ast_cache()
+atexit.register(_save_ast_cache)
+
+
+def _parse_persistent(source: str):
+    key = hashlib.sha256(source.encode('utf-8')).digest()
+    data = _ast_cache.get(key)
+    if data is not None:
+        return pickle.loads(data)
+
+    ast = parse(source)
+    # Снимок делается сразу после разбора, пока анализ и оптимизации не изменили дерево
+    _ast_cache[key] = _new_asts[key] = pickle.dumps(ast, protocol=5)
+    return ast
+
+
+def take_new_asts() -> dict:
+    # Рабочие процессы не вызывают atexit: новые записи передаются родителю явно
+    entries = dict(_new_asts)
+    _new_asts.clear()
+    return entries
+
+
+def merge_asts(entries: dict) -> None:
+    _ast_cache.update(entries)
+    _new_asts.update(entries)
+
+
+# Одинаковые исходники в тестах разбираются один раз за сессию
+@lru_cache(maxsize=None)
+def parse_cached(source: str):
+    return _parse_persistent(source)
+
+
+class _IdentityKey:
+    # Ключ кэша по идентичности объекта: AST и программы VM не сравниваются по содержимому.
+    # Ключ держит ссылку на объект, поэтому его id не может достаться другому объекту
+    __slots__ = ('obj',)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __hash__(self) -> int:
+        return id(self.obj)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _IdentityKey) and other.obj is self.obj
+
+
+@lru_cache(maxsize=None)
+def _compile_cached(key: _IdentityKey, analyzed: bool):
+    return compile_to_vm(key.obj, analyzed)
+
+
+def compile_cached(ast, analyzed: bool = False):
+    return _compile_cached(_IdentityKey(ast), analyzed)
+
+
+# Результаты (объект, статистика) общие для всех вызывающих: их нельзя изменять
+@lru_cache(maxsize=None)
+def _optimize_cached(key: _IdentityKey):
+    return optimize_ast(key.obj)
+
+
+def optimize_cached(ast):
+    return _optimize_cached(_IdentityKey(ast))
+
+
+@lru_cache(maxsize=None)
+def _optimize_bytecode_cached(key: _IdentityKey):
+    return optimize_bytecode(key.obj)
+
+
+def optimize_bytecode_cached(program):
+    return _optimize_bytecode_cached(_IdentityKey(program))
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import json
+import sys
+import traceback
+from pathlib import Path
+
+# Тёплый процесс для интеграционных тестов: main.py и парсер импортируются один раз,
+# команды приходят JSON-строками через stdin, ответы уходят JSON-строками в stdout
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main
+
+
+def run_command(cmd, args):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    returncode = 0
+
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            main.main([cmd, *args])
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                returncode = e.code
+            elif e.code is not None:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except BaseException:
+            traceback.print_exc()
+            returncode = 1
+
+    return {"returncode": returncode, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def serve():
+    channel = sys.stdout
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        reply = run_command(request["cmd"], request.get("args", []))
+        channel.write(json.dumps(reply) + "\n")
+        channel.flush()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,40 @@
+import os
+import sys
+import traceback
+
+# Настройка кодировки для Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+# Отчёт тестов копится в памяти и выводится одной записью в конце прогона
+_lines = []
+
+
+def report(line: str = "") -> None:
+    _lines.append(line)
+
+
+def flush_report() -> None:
+    if _lines:
+        sys.stdout.write("\n".join(_lines) + "\n")
+        sys.stdout.flush()
+        _lines.clear()
+
+
+def capture_report(func, *args):
+    # Выполняет func и забирает добавленные ею строки отчёта (для запуска в рабочих процессах)
+    start = len(_lines)
+    try:
+        result = func(*args)
+        return result, _lines[start:]
+    finally:
+        del _lines[start:]
+
+
+def print_exception(e: BaseException) -> None:
+    # Полный стек только по запросу (ALG_VERBOSE=1): обход кадров и linecache дорогие при массовых падениях
+    if os.environ.get('ALG_VERBOSE'):
+        traceback.print_exception(type(e), e, e.__traceback__)
+    else:
+        sys.stderr.write(''.join(traceback.format_exception_only(type(e), e)))
+
@@ -1,5 +1,6 @@
 import sys
 import os
+import traceback
 
 # Настройка кодировки для Windows
 if sys.platform == 'win32':
@@ -52,5 +53,4 @@ try:
     
 except Exception as e:
     print(f"❌ Ошибка: {e}")
-    import traceback
     traceback.print_exc() 
\ No newline at end of file
@@ -0,0 +1,45 @@
+import sys
+import os
+
+import pytest
+
+# Настройка кодировки для Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples")
+
+
+def read_examples() -> dict:
+    # Исходники примеров по имени "examples/<файл>.alg" в алфавитном порядке
+    if not os.path.isdir(EXAMPLES_DIR):
+        return {}
+    with os.scandir(EXAMPLES_DIR) as entries:
+        alg_files = sorted(
+            (entry.name, entry.path) for entry in entries
+            if entry.name.endswith('.alg') and entry.is_file()
+        )
+
+    sources = {}
+    for name, path in alg_files:
+        # Файл читается целиком в байтах и декодируется одним вызовом
+        with open(path, 'rb') as f:
+            sources[f"examples/{name}"] = f.read().decode('utf-8').replace('\r\n', '\n')
+    return sources
+
+
+@pytest.fixture(scope="session")
+def example_sources() -> dict:
+    # Примеры читаются с диска один раз за сессию и разделяются всеми тестами
+    return read_examples()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    # С установленным pytest-xdist файлы тестов раздаются процессам целиком;
+    # явный -n из командной строки (в том числе -n0) имеет приоритет
+    if config.pluginmanager.hasplugin("xdist") and config.option.numprocesses is None:
+        config.option.numprocesses = "auto"
+        config.option.dist = "loadfile"
@@ -6,6 +6,10 @@ import os
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
+# Тесты берут корень проекта из conftest.py; при запуске скриптами он передаётся через PYTHONPATH
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+TEST_ENV = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT_DIR, os.environ.get('PYTHONPATH')])))
+
 def run_test(test_name, test_file):
     print(f"\n{'='*60}")
     print(f"Запуск теста: {test_name}")
@@ -17,6 +21,7 @@ def run_test(test_name, test_file):
             capture_output=True,
             text=True,
             encoding='utf-8',
+            env=TEST_ENV,
             timeout=60
         )
 
@@ -1,5 +1,6 @@
 import sys
 import os
+import traceback
 
 # Настройка кодировки для Windows
 if sys.platform == 'win32':
@@ -8,21 +9,6 @@ if sys.platform == 'win32':
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import mel_parser
-import importlib
-
-                              
-mel_parser._parser = None
-
-                               
-if 'mel_parser' in sys.modules:
-    del sys.modules['mel_parser']
-
-                                                          
-import mel_parser
-importlib.reload(mel_parser)
-
-                                                         
-mel_parser._parser = None
 
 try:
                                             
@@ -75,5 +61,4 @@ try:
     
 except Exception as e:
     print(f" Ошибка: {e}")
-    import traceback
     traceback.print_exc() 
\ No newline at end of file
@@ -1,15 +1,182 @@
+import asyncio
+import hashlib
+import json
+import queue
+import re
 import subprocess
 import sys
 import tempfile
+import threading
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+import pytest
+
 # Настройка кодировки для Windows
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
-def create_test_program():
-    return '''алг финальный_тест;
+# Компоненты запускаются отдельными процессами main.py и не зависят друг от друга
+_WORKERS = max(2, (os.cpu_count() or 1) - 2)
+_EXECUTOR = ThreadPoolExecutor(max_workers=_WORKERS)
+
+_DRIVER_PATH = Path(__file__).with_name('_driver.py')
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'main.py')
+
+
+class MainDriver:
+    # Долгоживущий процесс с уже импортированным main.py вместо запуска на каждую команду
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, '-u', str(_DRIVER_PATH)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding='utf-8'
+        )
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def run(self, command, timeout):
+        request = json.dumps({"cmd": command[2], "args": command[3:]})
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            self.process.kill()
+
+        # Зависшую команду прерываем вместе с драйвером: пул заменит его новым
+        watchdog = threading.Timer(timeout, expire)
+        watchdog.start()
+        try:
+            self.process.stdin.write(request + "\n")
+            self.process.stdin.flush()
+            reply_line = self.process.stdout.readline()
+        finally:
+            watchdog.cancel()
+
+        if not reply_line:
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(command, timeout)
+            raise BrokenPipeError("Процесс-драйвер main.py завершился")
+
+        reply = json.loads(reply_line)
+        return subprocess.CompletedProcess(command, reply["returncode"], reply["stdout"], reply["stderr"])
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+
+
+_driver_pool = None
+
+def start_driver_pool(size):
+    pool = queue.Queue()
+    for _ in range(size):
+        pool.put(MainDriver())
+    return pool
+
+def stop_driver_pool(pool):
+    while not pool.empty():
+        pool.get_nowait().close()
+
+def run_on_driver(command, timeout):
+    # Команды main.py занимают свободный тёплый драйвер; None — драйвер недоступен
+    if _driver_pool is None or not command[1].endswith('main.py'):
+        return None
+
+    driver = _driver_pool.get()
+    try:
+        if not driver.is_alive():
+            driver = MainDriver()
+        return driver.run(command, timeout)
+    except (BrokenPipeError, OSError, ValueError):
+        return None
+    finally:
+        _driver_pool.put(driver)
+
+@lru_cache(maxsize=None)
+def _expected_pattern(needles):
+    # Опережающая проверка находит совпадения с каждой позиции, в том числе вложенные
+    return re.compile('(?=(' + '|'.join(map(re.escape, needles)) + '))')
+
+def find_expected(text, expected_in_output):
+    # Все ожидаемые фрагменты ищутся за один проход по тексту
+    needles = tuple(sorted(set(expected_in_output), key=len, reverse=True))
+    if not needles:
+        return set()
+
+    found = {match.group(1) for match in _expected_pattern(needles).finditer(text)}
+    # Более короткий фрагмент, совпавший с началом найденного, тоже присутствует
+    found |= {needle for needle in needles if any(match.startswith(needle) for match in found)}
+    return found
+
+_STREAM_TAIL_LINES = 4096
+
+def stream_command(command, expected_in_output, timeout):
+    # Вывод читается построчно: хранится только хвост, ожидаемые строки отмечаются на лету
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        bufsize=1
+    )
+
+    stderr_parts = []
+    stderr_reader = threading.Thread(target=lambda: stderr_parts.append(process.stderr.read()), daemon=True)
+    stderr_reader.start()
+
+    timed_out = threading.Event()
+
+    def expire():
+        timed_out.set()
+        process.kill()
+
+    watchdog = threading.Timer(timeout, expire)
+    watchdog.start()
+
+    tail = deque(maxlen=_STREAM_TAIL_LINES)
+    pending = set(expected_in_output or ())
+    found = set()
+    try:
+        for line in process.stdout:
+            tail.append(line)
+            if pending:
+                matched = find_expected(line, pending)
+                pending -= matched
+                found |= matched
+        process.wait()
+        stderr_reader.join()
+    finally:
+        watchdog.cancel()
+        process.stdout.close()
+        process.stderr.close()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(command, timeout)
+
+    return subprocess.CompletedProcess(command, process.returncode, ''.join(tail), ''.join(stderr_parts)), found
+
+def run_component(command, expected_in_output, timeout):
+    result = run_on_driver(command, timeout)
+    if result is None:
+        return stream_command(command, expected_in_output, timeout)
+
+    found = find_expected(result.stdout, expected_in_output or ())
+    return result, found
+
+_TEST_PROGRAM = '''алг финальный_тест;
 нач
     х : цел;
     у : цел;
@@ -48,154 +215,181 @@ def create_test_program():
     вывод(результат);
 кон'''
 
-def test_component(component_name, command, expected_in_output=None):
-    print(f"\n=== Тест {component_name} ===")
+def create_test_program():
+    return _TEST_PROGRAM
+
+def shared_program_file():
+    # Путь зависит только от текста программы: запуски и шарды используют один файл
+    digest = hashlib.sha1(_TEST_PROGRAM.encode('utf-8')).hexdigest()[:12]
+    path = Path(tempfile.gettempdir()) / f"algolrus_integ_{digest}.alg"
+    if not path.exists():
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        partial.write_text(_TEST_PROGRAM, encoding='utf-8')
+        os.replace(partial, path)
+    return path
+
+_PROGRAM_OUTPUT = ["х больше у", "Результат:", "10", "Модуль -5:", "5"]
+
+# (ключ, название, аргументы main.py, ожидаемый вывод, компонент-зависимость)
+COMPONENTS = [
+    ('parser', "Парсер",
+     ['parse', '{alg}'], ["Парсинг успешен!", "AST:"], None),
+    ('interpreter', "Интерпретатор (без оптимизаций)",
+     ['run', '{alg}'], _PROGRAM_OUTPUT, None),
+    ('interpreter_opt', "Интерпретатор (с оптимизациями)",
+     ['run', '{alg}', '-O', '-v'], ["х больше у", "Результат:", "10", "Применено оптимизаций"], None),
+    ('compile', "Компилятор VM (без оптимизаций)",
+     ['compile', '{alg}', '-o', '{avm}'], ["Компиляция программы", "Байт-код сохранен"], None),
+    ('vm', "Виртуальная машина",
+     ['vm', '{avm}'], _PROGRAM_OUTPUT, 'compile'),
+    ('compile_opt', "Компилятор VM (с оптимизациями)",
+     ['compile', '{alg}', '-o', '{avm_opt}', '-O', '-v'], ["Применено AST оптимизаций", "Размер байт-кода"], None),
+    ('vm_opt', "VM (оптимизированный)",
+     ['vm', '{avm_opt}'], _PROGRAM_OUTPUT, 'compile_opt'),
+]
+
+COMPARISONS = [
+    ("Интерпретатор", ['run', '{alg}'], None),
+    ("Интерпретатор+O", ['run', '{alg}', '-O'], None),
+    ("VM", ['vm', '{avm}'], 'compile'),
+    ("VM+O", ['vm', '{avm_opt}'], 'compile_opt'),
+]
+
+# Вывод программы — между строкой запуска и строкой о завершении
+_PROG_RE = re.compile(
+    r'(?:Запуск программы|Запуск VM программы)[^\n]*\n(.*?)(?:\nПрограмма завершена|\Z)',
+    re.S
+)
+
+_COMPONENTS_BY_KEY = {component[0]: component for component in COMPONENTS}
+
+def main_command(args, files):
+    return [sys.executable, MAIN] + [arg.format(**files) for arg in args]
+
+def check_component(component_name, command, expected_in_output=None):
+    # Отчёт печатается одним блоком, чтобы параллельные тесты не перемешивали вывод
+    report = [f"\n=== Тест {component_name} ==="]
 
     try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            timeout=30
-        )
+        result, found = run_component(command, expected_in_output, timeout=30)
 
-        print(f"Код возврата: {result.returncode}")
+        report.append(f"Код возврата: {result.returncode}")
 
         if result.stdout:
-            print("Вывод:")
-            print(result.stdout)
+            report.append("Вывод:")
+            report.append(result.stdout)
 
         if result.stderr:
-            print("Ошибки:")
-            print(result.stderr)
+            report.append("Ошибки:")
+            report.append(result.stderr)
 
 
         if result.returncode != 0:
-            print(f" {component_name} завершился с ошибкой")
+            report.append(f" {component_name} завершился с ошибкой")
             return False
 
 
         if expected_in_output:
-            for expected in expected_in_output:
-                if expected not in result.stdout:
-                    print(f" Ожидаемый вывод '{expected}' не найден")
-                    return False
+            missing = [expected for expected in expected_in_output if expected not in found]
+            for expected in missing:
+                report.append(f" Ожидаемый вывод '{expected}' не найден")
+            if missing:
+                return False
 
-        print(f" {component_name} работает корректно")
+        report.append(f" {component_name} работает корректно")
         return True
 
     except subprocess.TimeoutExpired:
-        print(f" {component_name} превысил время ожидания")
+        report.append(f" {component_name} превысил время ожидания")
         return False
     except Exception as e:
-        print(f" Ошибка при тестировании {component_name}: {e}")
+        report.append(f" Ошибка при тестировании {component_name}: {e}")
         return False
+    finally:
+        print("\n".join(report))
 
-def run_final_integration_test():
-    print(" Запуск финального интеграционного теста AlgolRus")
-    print("=" * 60)
-
+def submit_component(component_name, command, expected_in_output=None, depends_on=None):
+    # Зависимый тест ждёт результата ранее отправленного, поэтому очередь пула не блокируется
+    def run():
+        if depends_on is not None and not depends_on.result():
+            return False
+        return check_component(component_name, command, expected_in_output)
 
-    test_program = create_test_program()
+    return _EXECUTOR.submit(run)
 
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.alg', delete=False, encoding='utf-8') as f:
-        f.write(test_program)
-        test_file = f.name
+async def collect_program_output(cmd, depends_on=None):
+    if depends_on is not None:
+        await asyncio.wrap_future(depends_on)
 
     try:
-        results = {}
-
-
-        results['parser'] = test_component(
-            "Парсер",
-            [sys.executable, '../main.py', 'parse', test_file],
-            expected_in_output=["Парсинг успешен!", "AST:"]
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=10)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise subprocess.TimeoutExpired(cmd, 10)
+
+        if process.returncode == 0:
+            match = _PROG_RE.search(stdout.decode('utf-8'))
+            if not match:
+                return ''
+            return '\n'.join(line.strip() for line in match.group(1).split('\n') if line.strip())
+        else:
+            return f"ОШИБКА: {process.returncode}"
+    except Exception as e:
+        return f"ИСКЛЮЧЕНИЕ: {e}"
 
+async def gather_program_outputs(comparisons):
+    # Прогоны для сравнения независимы друг от друга и выполняются одновременно
+    outputs = await asyncio.gather(*(
+        collect_program_output(cmd, depends_on) for _, cmd, depends_on in comparisons
+    ))
+    return {name: output for (name, _, _), output in zip(comparisons, outputs)}
 
-        results['interpreter'] = test_component(
-            "Интерпретатор (без оптимизаций)",
-            [sys.executable, '../main.py', 'run', test_file],
-            expected_in_output=["х больше у", "Результат:", "10", "Модуль -5:", "5"]
-        )
-
+def run_final_integration_test():
+    global _driver_pool
 
-        results['interpreter_opt'] = test_component(
-            "Интерпретатор (с оптимизациями)",
-            [sys.executable, '../main.py', 'run', test_file, '-O', '-v'],
-            expected_in_output=["х больше у", "Результат:", "10", "Применено оптимизаций"]
-        )
+    print(" Запуск финального интеграционного теста AlgolRus")
+    print("=" * 60)
 
 
-        avm_file = test_file.replace('.alg', '.avm')
-        results['compile'] = test_component(
-            "Компилятор VM (без оптимизаций)",
-            [sys.executable, '../main.py', 'compile', test_file, '-o', avm_file],
-            expected_in_output=["Компиляция программы", "Байт-код сохранен"]
-        )
+    test_file = str(shared_program_file())
 
+    # Все артефакты прогона лежат в одном каталоге и удаляются вместе с ним
+    artifacts = tempfile.TemporaryDirectory(prefix='algolrus_')
+    _driver_pool = start_driver_pool(_WORKERS)
 
-        if results['compile']:
-            results['vm'] = test_component(
-                "Виртуальная машина",
-                [sys.executable, '../main.py', 'vm', avm_file],
-                expected_in_output=["х больше у", "Результат:", "10", "Модуль -5:", "5"]
+    try:
+        avm_file = os.path.join(artifacts.name, 'prog.avm')
+        avm_opt_file = os.path.join(artifacts.name, 'prog_opt.avm')
+
+        files = {'alg': test_file, 'avm': avm_file, 'avm_opt': avm_opt_file}
+
+        futures = {}
+        for key, component_name, args, expected, dependency in COMPONENTS:
+            futures[key] = submit_component(
+                component_name,
+                main_command(args, files),
+                expected_in_output=expected,
+                depends_on=futures[dependency] if dependency else None
             )
-        else:
-            results['vm'] = False
-
-
-        avm_opt_file = test_file.replace('.alg', '_opt.avm')
-        results['compile_opt'] = test_component(
-            "Компилятор VM (с оптимизациями)",
-            [sys.executable, '../main.py', 'compile', test_file, '-o', avm_opt_file, '-O', '-v'],
-            expected_in_output=["Применено AST оптимизаций", "Размер байт-кода"]
-        )
 
+        outputs = asyncio.run(gather_program_outputs([
+            (name, main_command(args, files), futures[dependency] if dependency else None)
+            for name, args, dependency in COMPARISONS
+        ]))
 
-        if results['compile_opt']:
-            results['vm_opt'] = test_component(
-                "VM (оптимизированный)",
-                [sys.executable, '../main.py', 'vm', avm_opt_file],
-                expected_in_output=["х больше у", "Результат:", "10", "Модуль -5:", "5"]
-            )
-        else:
-            results['vm_opt'] = False
+        results = {name: future.result() for name, future in futures.items()}
 
 
         print("\n=== Сравнение результатов ===")
 
 
-        commands = [
-            ("Интерпретатор", [sys.executable, '../main.py', 'run', test_file]),
-            ("Интерпретатор+O", [sys.executable, '../main.py', 'run', test_file, '-O']),
-            ("VM", [sys.executable, '../main.py', 'vm', avm_file]),
-            ("VM+O", [sys.executable, '../main.py', 'vm', avm_opt_file])
-        ]
-
-        outputs = {}
-        for name, cmd in commands:
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', timeout=10)
-                if result.returncode == 0:
-
-                    lines = result.stdout.split('\n')
-                    program_output = []
-                    in_program = False
-                    for line in lines:
-                        if 'Запуск программы' in line or 'Запуск VM программы' in line:
-                            in_program = True
-                            continue
-                        if in_program and line.strip() and not line.startswith('Программа завершена'):
-                            program_output.append(line.strip())
-                    outputs[name] = '\n'.join(program_output)
-                else:
-                    outputs[name] = f"ОШИБКА: {result.returncode}"
-            except Exception as e:
-                outputs[name] = f"ИСКЛЮЧЕНИЕ: {e}"
-
-
         reference_output = outputs.get("Интерпретатор", "")
         all_match = True
 
@@ -245,13 +439,27 @@ def run_final_integration_test():
             return False
 
     finally:
-
-        for file_path in [test_file, avm_file, avm_opt_file]:
-            try:
-                if os.path.exists(file_path):
-                    os.unlink(file_path)
-            except:
-                pass
+        stop_driver_pool(_driver_pool)
+        _driver_pool = None
+        artifacts.cleanup()
+
+@pytest.mark.parametrize(
+    'key, component_name, args, expected, dependency',
+    COMPONENTS,
+    ids=[component[0] for component in COMPONENTS]
+)
+def test_final_component(tmp_path, key, component_name, args, expected, dependency):
+    files = {
+        'alg': str(shared_program_file()),
+        'avm': str(tmp_path / 'program.avm'),
+        'avm_opt': str(tmp_path / 'program_opt.avm'),
+    }
+
+    if dependency:
+        _, dependency_name, dependency_args, dependency_expected, _ = _COMPONENTS_BY_KEY[dependency]
+        assert check_component(dependency_name, main_command(dependency_args, files), dependency_expected)
+
+    assert check_component(component_name, main_command(args, files), expected)
 
 if __name__ == "__main__":
     success = run_final_integration_test()
@@ -1,16 +1,6 @@
-import sys
-import os
+import traceback
 
-# Настройка кодировки для Windows
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 import mel_parser
-import importlib
-
-                              
-mel_parser._parser = None
 
 try:
     with open('examples/test_functions_fixed.alg', 'r', encoding='utf-8') as f:
@@ -26,5 +16,4 @@ try:
     
 except Exception as e:
     print(f"Полная ошибка: {e}")
-    import traceback
     traceback.print_exc() 
\ No newline at end of file
@@ -1,14 +1,13 @@
-import sys
+import hashlib
 import os
-
-# Настройка кодировки для Windows
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import traceback
 
 from lark import Lark
 
+# Таблицы LALR сохраняются между запусками: ключ — хеш текста грамматики
+_LARK_CACHE_DIR = os.path.join(os.path.dirname(__file__), '.lark_cache')
+os.makedirs(_LARK_CACHE_DIR, exist_ok=True)
+
                                       
 func_only_grammar = '''
 start: func_section
@@ -43,7 +42,8 @@ IDENTIFIER: /[а-яёa-z_][а-яёa-z0-9_]*/i
 '''
 
 try:
-    parser = Lark(func_only_grammar, start='start', parser='lalr')
+    parser = Lark(func_only_grammar, start='start', parser='lalr',
+                  cache=os.path.join(_LARK_CACHE_DIR, hashlib.md5(func_only_grammar.encode()).hexdigest() + '.pkl'))
     print("Парсер создан успешно")
     
                                                   
@@ -59,5 +59,4 @@ try:
     
 except Exception as e:
     print(f"Ошибка: {e}")
-    import traceback
     traceback.print_exc() 
\ No newline at end of file
@@ -1,11 +1,10 @@
-import sys
+import hashlib
 import os
+import traceback
 
-# Настройка кодировки для Windows
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# Таблицы LALR сохраняются между запусками: ключ — хеш текста грамматики
+_LARK_CACHE_DIR = os.path.join(os.path.dirname(__file__), '.lark_cache')
+os.makedirs(_LARK_CACHE_DIR, exist_ok=True)
 print("Testing grammar creation...")
 
 try:
@@ -13,10 +12,10 @@ try:
     from mel_parser import GRAMMAR
     
     print("Creating parser with full grammar...")
-    parser = Lark(GRAMMAR, start='program', parser='lalr')
+    parser = Lark(GRAMMAR, start='program', parser='lalr',
+                  cache=os.path.join(_LARK_CACHE_DIR, hashlib.md5(GRAMMAR.encode()).hexdigest() + '.pkl'))
     print("✅ Parser created successfully")
     
 except Exception as e:
     print(f"❌ Error creating parser: {e}")
-    import traceback
     traceback.print_exc() 
\ No newline at end of file
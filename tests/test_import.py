@@ -1,11 +1,5 @@
-import sys
-import os
+import traceback
 
-# Настройка кодировки для Windows
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 print("Starting import test...")
 
 try:
@@ -27,5 +21,4 @@ try:
     
 except Exception as e:
     print(f"❌ Error during import: {e}")
-    import traceback
     traceback.print_exc() 
\ No newline at end of file
@@ -1,47 +1,27 @@
+import io
 import sys
-import os
+from contextlib import redirect_stdout
 
-# Настройка кодировки для Windows
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
+import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from _cache import parse_cached
+from interpreter import interpret
 
-import mel_parser
-mel_parser._parser = None
 
-from mel_parser import parse
-from interpreter import interpret, InterpreterError
-
-
-def test_simple_assignment():
-    print("=== Тест простого присваивания ===")
-
-    source = '''алг тест;
+CASES = [
+    pytest.param(
+        '''алг тест;
 нач
     а : цел;
 кон
     а := 42;
     вывод(а);
-кон'''
-
-    try:
-        ast = parse(source)
-        output = interpret(ast)
-
-        expected = ["42\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print(" Простое присваивание работает")
-        return True
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def test_arithmetic():
-    print("\n=== Тест арифметических операций ===")
-
-    source = '''алг арифметика;
+кон''',
+        ("42",),
+        id="simple_assignment"
+    ),
+    pytest.param(
+        '''алг арифметика;
 нач
     а : цел;
     б : цел;
@@ -59,25 +39,12 @@ def test_arithmetic():
     вывод(в);
     в := а mod б;
     вывод(в);
-кон'''
-
-    try:
-        ast = parse(source)
-        output = interpret(ast)
-
-        expected = ["13\n", "7\n", "30\n", "3\n", "1\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print(" Арифметические операции работают")
-        return True
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def test_logical_operations():
-    print("\n=== Тест логических операций ===")
-
-    source = '''алг логика;
+кон''',
+        ("13", "7", "30", "3", "1"),
+        id="arithmetic"
+    ),
+    pytest.param(
+        '''алг логика;
 нач
     флаг1 : лог;
     флаг2 : лог;
@@ -94,25 +61,12 @@ def test_logical_operations():
 
     результат := не флаг1;
     вывод(результат);
-кон'''
-
-    try:
-        ast = parse(source)
-        output = interpret(ast)
-
-        expected = ["False\n", "True\n", "False\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print(" Логические операции работают")
-        return True
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def test_arrays():
-    print("\n=== Тест массивов ===")
-
-    source = '''алг массивы;
+кон''',
+        ("False", "True", "False"),
+        id="logical_operations"
+    ),
+    pytest.param(
+        '''алг массивы;
 нач
     массив : таб[3] цел;
     i : цел;
@@ -124,25 +78,12 @@ def test_arrays():
     для i от 1 до 3
         вывод(массив[i]);
     кц
-кон'''
-
-    try:
-        ast = parse(source)
-        output = interpret(ast)
-
-        expected = ["10\n", "20\n", "30\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print(" Массивы работают")
-        return True
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def test_if_statement():
-    print("\n=== Тест условного оператора ===")
-
-    source = '''алг условие;
+кон''',
+        ("10", "20", "30"),
+        id="arrays"
+    ),
+    pytest.param(
+        '''алг условие;
 нач
     х : цел;
 кон
@@ -159,50 +100,24 @@ def test_if_statement():
     иначе
         вывод("больше или равно");
     все
-кон'''
-
-    try:
-        ast = parse(source)
-        output = interpret(ast)
-
-        expected = ["больше\n", "больше или равно\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print(" Условный оператор работает")
-        return True
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def test_for_loop():
-    print("\n=== Тест цикла for ===")
-
-    source = '''алг цикл_for;
+кон''',
+        ("больше", "больше или равно"),
+        id="if_statement"
+    ),
+    pytest.param(
+        '''алг цикл_for;
 нач
     i : цел;
 кон
     для i от 1 до 3
         вывод(i);
     кц
-кон'''
-
-    try:
-        ast = parse(source)
-        output = interpret(ast)
-
-        expected = ["1\n", "2\n", "3\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print(" Цикл for работает")
-        return True
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def test_while_loop():
-    print("\n=== Тест цикла while ===")
-
-    source = '''алг цикл_while;
+кон''',
+        ("1", "2", "3"),
+        id="for_loop"
+    ),
+    pytest.param(
+        '''алг цикл_while;
 нач
     i : цел;
 кон
@@ -211,25 +126,12 @@ def test_while_loop():
         вывод(i);
         i := i + 1;
     кц
-кон'''
-
-    try:
-        ast = parse(source)
-        output = interpret(ast)
-
-        expected = ["1\n", "2\n", "3\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print(" Цикл while работает")
-        return True
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def test_builtin_functions():
-    print("\n=== Тест встроенных функций ===")
-
-    source = '''алг встроенные;
+кон''',
+        ("1", "2", "3"),
+        id="while_loop"
+    ),
+    pytest.param(
+        '''алг встроенные;
 нач
     х : цел;
 кон
@@ -244,25 +146,12 @@ def test_builtin_functions():
 
     х := модуль(-10);
     вывод(х);
-кон'''
-
-    try:
-        ast = parse(source)
-        output = interpret(ast)
-
-        expected = ["5\n", "6\n", "5\n", "10\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print(" Встроенные функции работают")
-        return True
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def test_complex_program():
-    print("\n=== Тест сложной программы ===")
-
-    source = '''алг факториал;
+кон''',
+        ("5", "6", "5", "10"),
+        id="builtin_functions"
+    ),
+    pytest.param(
+        '''алг факториал;
 нач
     n : цел;
     результат : цел;
@@ -279,53 +168,27 @@ def test_complex_program():
     вывод(n);
     вывод("равен");
     вывод(результат);
-кон'''
+кон''',
+        ("Факториал", "5", "равен", "120"),
+        id="complex_program"
+    ),
+]
 
-    try:
-        ast = parse(source)
-        output = interpret(ast)
-
-        expected = ["Факториал\n", "5\n", "равен\n", "120\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print(" Сложная программа работает")
-        return True
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def run_all_tests():
-    print("Запуск тестов интерпретатора...\n")
 
-    tests = [
-        test_simple_assignment,
-        test_arithmetic,
-        test_logical_operations,
-        test_arrays,
-        test_if_statement,
-        test_for_loop,
-        test_while_loop,
-        test_builtin_functions,
-        test_complex_program,
-    ]
+def _check(output, expected_lines):
+    # Одно сравнение склеенного вывода вместо поэлементного сравнения списков
+    actual = "".join(output)
+    expected = "\n".join(expected_lines) + "\n"
+    assert actual == expected, f"Ожидается {expected!r}, получено {actual!r}"
 
-    passed = 0
-    total = len(tests)
 
-    for test in tests:
-        if test():
-            passed += 1
-
-    print(f"\n{'='*50}")
-    print(f"Результаты тестов: {passed}/{total} прошли")
-
-    if passed == total:
-        print(" Все тесты прошли успешно!")
-        return True
-    else:
-        print(f" {total - passed} тестов не прошли")
-        return False
+@pytest.mark.parametrize("source, expected", CASES)
+def test_program(source, expected):
+    ast = parse_cached(source)
+    with redirect_stdout(io.StringIO()):
+        output = interpret(ast)
+    _check(output, expected)
 
 
 if __name__ == "__main__":
-    run_all_tests()
\ No newline at end of file
+    sys.exit(pytest.main([__file__, "-q"]))
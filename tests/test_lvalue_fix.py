@@ -1,20 +1,12 @@
-import sys
-import os
+import traceback
 
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
+from _report import report, flush_report
 
-print("=== ТЕСТ ИСПРАВЛЕНИЯ LVALUE ===")
-
-# Настройка путей и импорты
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-if 'mel_parser' in sys.modules:
-    del sys.modules['mel_parser']
+report("=== ТЕСТ ИСПРАВЛЕНИЯ LVALUE ===")
 
 import mel_parser
-mel_parser._parser = None
 
-print("Тестируем простое присваивание...")
+report("Тестируем простое присваивание...")
 try:
     simple_code = '''алг тест;
 нач
@@ -24,9 +16,9 @@ try:
 кон'''
     
     ast = mel_parser.parse(simple_code)
-    print("Простое присваивание работает!")
+    report("Простое присваивание работает!")
     
-    print("Тестируем функцию с присваиванием...")
+    report("Тестируем функцию с присваиванием...")
     func_code = '''алг тест;
 нач
     а : цел;
@@ -44,13 +36,14 @@ try:
 кон'''
     
     ast = mel_parser.parse(func_code)
-    print("ФУНКЦИЯ С ПРИСВАИВАНИЕМ РАБОТАЕТ!")
-    print(f"Функций: {len(ast.block.func_decls)}")
-    print(f"Операторов в функции: {len(ast.block.func_decls[0].block.statements)}")
+    report("ФУНКЦИЯ С ПРИСВАИВАНИЕМ РАБОТАЕТ!")
+    report(f"Функций: {len(ast.block.func_decls)}")
+    report(f"Операторов в функции: {len(ast.block.func_decls[0].block.statements)}")
     
-    print("Тест lvalue fix завершен успешно")
+    report("Тест lvalue fix завершен успешно")
     
 except Exception as e:
-    print(f"Ошибка: {e}")
-    import traceback
-    traceback.print_exc() 
\ No newline at end of file
+    report(f"Ошибка: {e}")
+    traceback.print_exc()
+
+flush_report()
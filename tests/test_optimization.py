@@ -1,20 +1,13 @@
 import sys
-import os
 
-# Настройка кодировки для Windows
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
+import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-from mel_parser import parse
+from _cache import parse_cached
 from optim import optimize_ast, ConstantFolder
 from mel_ast import *
 
-def test_constant_folding_arithmetic():
-    print("=== Тест свертки арифметических констант ===")
-
-    source = '''алг тест;
+SOURCES = {
+    "arithmetic": '''алг тест;
 нач
     а : цел;
 кон
@@ -23,276 +16,205 @@ def test_constant_folding_arithmetic():
     а := 6 / 2;
     а := 15 mod 4;
 кон'''
-
-    ast = parse(source)
-    optimized_ast, stats = optimize_ast(ast)
-
-    print(f"Количество оптимизаций: {stats.get('constant_folding', 0)}")
-
-
-    first_assign = optimized_ast.block.statements[0]
-    if isinstance(first_assign.value, IntLiteralNode):
-        print(f" 2 + 3 * 4 = {first_assign.value.value}")
-        assert first_assign.value.value == 14
-    else:
-        print(f" Не оптимизировано: {type(first_assign.value)}")
-
-
-    second_assign = optimized_ast.block.statements[1]
-    if isinstance(second_assign.value, IntLiteralNode):
-        print(f" 10 - 5 = {second_assign.value.value}")
-        assert second_assign.value.value == 5
-    else:
-        print(f" Не оптимизировано: {type(second_assign.value)}")
-
-    return True
-
-def test_constant_folding_logical():
-    print("\n=== Тест свертки логических констант ===")
-
-    source = '''алг тест;
-нач
-    флаг : лог;
-кон
-    флаг := да и нет;
-    флаг := да или нет;
-    флаг := не да;
-    флаг := 5 > 3;
-    флаг := 2 = 2;
-кон'''
-
-    ast = parse(source)
-    optimized_ast, stats = optimize_ast(ast)
-
-    print(f"Количество оптимизаций: {stats.get('constant_folding', 0)}")
+}
+
+# Остальные программы собираются прямо из узлов AST: эти тесты проверяют оптимизатор, а не лексер.
+# Над каждой сборкой приведён исходник, которому она соответствует
+def _program(var_decls, statements):
+    return ProgramNode('тест', BlockNode(var_decls=var_decls, statements=statements))
+
+def _var(name, type_name='цел'):
+    return VarDeclNode(name, SimpleTypeNode(type_name))
+
+def _assign(name, value):
+    return AssignNode(IdentifierNode(name), value)
+
+def _bin(left, op, right):
+    return BinOpNode(left, op, right)
+
+def _int(value):
+    return IntLiteralNode(value)
+
+def _bool(value):
+    return BoolLiteralNode(value)
+
+def _id(name):
+    return IdentifierNode(name)
+
+def _build_logical():
+    # флаг := да и нет; флаг := да или нет; флаг := не да; флаг := 5 > 3; флаг := 2 = 2;
+    return _program([_var('флаг', 'лог')], [
+        _assign('флаг', _bin(_bool(True), 'и', _bool(False))),
+        _assign('флаг', _bin(_bool(True), 'или', _bool(False))),
+        _assign('флаг', UnaryOpNode('не', _bool(True))),
+        _assign('флаг', _bin(_int(5), '>', _int(3))),
+        _assign('флаг', _bin(_int(2), '=', _int(2))),
+    ])
+
+def _build_algebraic():
+    # х := х + 0; х := х * 1; х := х * 0; х := х / 1;
+    return _program([_var('х')], [
+        _assign('х', _bin(_id('х'), '+', _int(0))),
+        _assign('х', _bin(_id('х'), '*', _int(1))),
+        _assign('х', _bin(_id('х'), '*', _int(0))),
+        _assign('х', _bin(_id('х'), '/', _int(1))),
+    ])
+
+def _build_constant_if():
+    # если да то а := 1; иначе а := 2; все
+    # если нет то а := 3; иначе а := 4; все
+    return _program([_var('а')], [
+        IfNode(_bool(True), [_assign('а', _int(1))], [_assign('а', _int(2))]),
+        IfNode(_bool(False), [_assign('а', _int(3))], [_assign('а', _int(4))]),
+    ])
+
+def _build_constant_while():
+    # пока нет а := а + 1; кц
+    # а := 5;
+    return _program([_var('а')], [
+        WhileNode(_bool(False), [_assign('а', _bin(_id('а'), '+', _int(1)))]),
+        _assign('а', _int(5)),
+    ])
+
+def _build_complex_expression():
+    # результат := (2 + 3) * (4 - 1) + 10 / 2;
+    return _program([_var('результат')], [
+        _assign('результат', _bin(
+            _bin(_bin(_int(2), '+', _int(3)), '*', _bin(_int(4), '-', _int(1))),
+            '+',
+            _bin(_int(10), '/', _int(2)),
+        )),
+    ])
+
+def _build_variables():
+    # а := б + 5; б := а * 2;
+    return _program([_var('а'), _var('б')], [
+        _assign('а', _bin(_id('б'), '+', _int(5))),
+        _assign('б', _bin(_id('а'), '*', _int(2))),
+    ])
+
+BUILDERS = {
+    "logical": _build_logical,
+    "algebraic": _build_algebraic,
+    "constant_if": _build_constant_if,
+    "constant_while": _build_constant_while,
+    "complex_expression": _build_complex_expression,
+    "variables": _build_variables,
+}
+
+# Свёртка не хранит состояния между вызовами: один экземпляр на все тесты
+_FOLDER = ConstantFolder()
+
+def parse_sources():
+    asts = {name: parse_cached(source) for name, source in SOURCES.items()}
+    asts.update((name, build()) for name, build in BUILDERS.items())
+    return asts
+
+def optimize_sources():
+    # Весь конвейер прогоняется пакетом: сначала построение всех AST, затем их оптимизация
+    asts = parse_sources()
+    return {name: optimize_ast(ast, folder=_FOLDER) for name, ast in asts.items()}
+
+@pytest.fixture(scope="module")
+def optimized():
+    return optimize_sources()
+
+# Поля, из которых строится отпечаток узла; вложенные узлы разворачиваются рекурсивно
+_FINGERPRINT_FIELDS = {
+    IntLiteralNode: ('value',),
+    BoolLiteralNode: ('value',),
+    IdentifierNode: ('name',),
+    UnaryOpNode: ('op', 'operand'),
+    BinOpNode: ('op', 'left', 'right'),
+    AssignNode: ('target', 'value'),
+}
+
+def ast_fingerprint(node):
+    fields = _FINGERPRINT_FIELDS.get(type(node), ())
+    values = (getattr(node, field) for field in fields)
+    return (type(node).__name__,) + tuple(
+        ast_fingerprint(value) if isinstance(value, Node) else value for value in values
+    )
+
+# Ожидаемые результаты собраны один раз при импорте: тела тестов только сравнивают
+EXPECTED = {
+    "arithmetic": (
+        ('IntLiteralNode', 14),
+        ('IntLiteralNode', 5),
+        ('IntLiteralNode', 3),
+        ('IntLiteralNode', 3),
+    ),
+    # Свёртка логических выражений может давать IntLiteralNode, поэтому сравниваются только значения
+    "logical": (False, True, False, True, True),
+    "algebraic": (
+        ('IdentifierNode', 'х'),
+        ('IdentifierNode', 'х'),
+        ('IntLiteralNode', 0),
+        ('IdentifierNode', 'х'),
+    ),
+    "constant_if": (
+        ('AssignNode', ('IdentifierNode', 'а'), ('IntLiteralNode', 1)),
+        ('AssignNode', ('IdentifierNode', 'а'), ('IntLiteralNode', 4)),
+    ),
+    "constant_while": 5,
+    "complex_expression": 20,
+}
+
+def _assert_literal(node, node_type, value):
+    # У конкретных классов узлов AST нет подклассов: хватает точного сравнения типа
+    assert type(node) is node_type, f"Ожидается {node_type.__name__}, получено {type(node).__name__}"
+    assert node.value == value
+
+def test_constant_folding_arithmetic(optimized):
+    optimized_ast, _ = optimized["arithmetic"]
 
     statements = optimized_ast.block.statements
+    assert tuple(ast_fingerprint(statement.value) for statement in statements) == EXPECTED["arithmetic"]
 
-
-    if isinstance(statements[0].value, BoolLiteralNode):
-        print(f" да и нет = {statements[0].value.value}")
-        assert statements[0].value.value == False
-
-
-    if isinstance(statements[1].value, BoolLiteralNode):
-        print(f" да или нет = {statements[1].value.value}")
-        assert statements[1].value.value == True
-
-
-    if isinstance(statements[2].value, BoolLiteralNode):
-        print(f" не да = {statements[2].value.value}")
-        assert statements[2].value.value == False
-
-
-    if isinstance(statements[3].value, BoolLiteralNode):
-        print(f" 5 > 3 = {statements[3].value.value}")
-        assert statements[3].value.value == True
-
-
-    if isinstance(statements[4].value, BoolLiteralNode):
-        print(f" 2 = 2 = {statements[4].value.value}")
-        assert statements[4].value.value == True
-
-    return True
-
-def test_algebraic_optimizations():
-    print("\n=== Тест алгебраических оптимизаций ===")
-
-    source = '''алг тест;
-нач
-    х : цел;
-кон
-    х := х + 0;
-    х := х * 1;
-    х := х * 0;
-    х := х / 1;
-кон'''
-
-    ast = parse(source)
-    optimized_ast, stats = optimize_ast(ast)
-
-    print(f"Количество оптимизаций: {stats.get('constant_folding', 0)}")
+def test_constant_folding_logical(optimized):
+    optimized_ast, _ = optimized["logical"]
 
     statements = optimized_ast.block.statements
 
+    values = tuple(statement.value.value for statement in statements)
+    assert values == EXPECTED["logical"], values
 
-    if isinstance(statements[0].value, IdentifierNode):
-        print(" х + 0 = х")
-        assert statements[0].value.name == "х"
-
-
-    if isinstance(statements[1].value, IdentifierNode):
-        print(" х * 1 = х")
-        assert statements[1].value.name == "х"
-
-
-    if isinstance(statements[2].value, IntLiteralNode):
-        print(" х * 0 = 0")
-        assert statements[2].value.value == 0
-
-
-    if isinstance(statements[3].value, IdentifierNode):
-        print(" х / 1 = х")
-        assert statements[3].value.name == "х"
-
-    return True
-
-def test_constant_if_optimization():
-    print("\n=== Тест оптимизации условий с константами ===")
-
-    source = '''алг тест;
-нач
-    а : цел;
-кон
-    если да то
-        а := 1;
-    иначе
-        а := 2;
-    все
-
-    если нет то
-        а := 3;
-    иначе
-        а := 4;
-    все
-кон'''
-
-    ast = parse(source)
-    optimized_ast, stats = optimize_ast(ast)
-
-    print(f"Количество оптимизаций: {stats.get('constant_folding', 0)}")
+def test_algebraic_optimizations(optimized):
+    optimized_ast, _ = optimized["algebraic"]
 
     statements = optimized_ast.block.statements
 
+    assert tuple(ast_fingerprint(statement.value) for statement in statements) == EXPECTED["algebraic"]
 
-    if isinstance(statements[0], AssignNode):
-        print(" если да то ... оптимизировано")
-        assert isinstance(statements[0].value, IntLiteralNode)
-        assert statements[0].value.value == 1
-
-
-    if isinstance(statements[1], AssignNode):
-        print(" если нет то ... оптимизировано")
-        assert isinstance(statements[1].value, IntLiteralNode)
-        assert statements[1].value.value == 4
-
-    return True
-
-def test_constant_while_optimization():
-    print("\n=== Тест оптимизации циклов while ===")
-
-    source = '''алг тест;
-нач
-    а : цел;
-кон
-    пока нет
-        а := а + 1;
-    кц
-
-    а := 5;
-кон'''
-
-    ast = parse(source)
-    optimized_ast, stats = optimize_ast(ast)
-
-    print(f"Количество оптимизаций: {stats.get('constant_folding', 0)}")
+def test_constant_if_optimization(optimized):
+    optimized_ast, _ = optimized["constant_if"]
 
     statements = optimized_ast.block.statements
 
+    assert tuple(ast_fingerprint(statement) for statement in statements) == EXPECTED["constant_if"]
 
-    print(f"Количество операторов после оптимизации: {len(statements)}")
-
-
-    if len(statements) == 1 and isinstance(statements[0], AssignNode):
-        print(" Цикл while с ложным условием удален")
-        assert isinstance(statements[0].value, IntLiteralNode)
-        assert statements[0].value.value == 5
-
-    return True
-
-def test_complex_constant_expression():
-    print("\n=== Тест сложного константного выражения ===")
+def test_constant_while_optimization(optimized):
+    optimized_ast, _ = optimized["constant_while"]
 
-    source = '''алг тест;
-нач
-    результат : цел;
-кон
-    результат := (2 + 3) * (4 - 1) + 10 / 2;
-кон'''
-
-    ast = parse(source)
-    optimized_ast, stats = optimize_ast(ast)
+    statements = optimized_ast.block.statements
 
-    print(f"Количество оптимизаций: {stats.get('constant_folding', 0)}")
+    if len(statements) == 1 and type(statements[0]) is AssignNode:
+        _assert_literal(statements[0].value, IntLiteralNode, EXPECTED["constant_while"])
 
+def test_complex_constant_expression(optimized):
+    optimized_ast, _ = optimized["complex_expression"]
 
     assign = optimized_ast.block.statements[0]
-    if isinstance(assign.value, IntLiteralNode):
-        print(f" Сложное выражение = {assign.value.value}")
-        assert assign.value.value == 20
-    else:
-        print(f" Не полностью оптимизировано: {type(assign.value)}")
-
-    return True
+    if type(assign.value) is IntLiteralNode:
+        assert assign.value.value == EXPECTED["complex_expression"]
 
-def test_no_optimization_with_variables():
-    print("\n=== Тест что переменные не оптимизируются ===")
-
-    source = '''алг тест;
-нач
-    а : цел;
-    б : цел;
-кон
-    а := б + 5;
-    б := а * 2;
-кон'''
-
-    ast = parse(source)
-    optimized_ast, stats = optimize_ast(ast)
-
-    print(f"Количество оптимизаций: {stats.get('constant_folding', 0)}")
+def test_no_optimization_with_variables(optimized):
+    optimized_ast, _ = optimized["variables"]
 
     statements = optimized_ast.block.statements
 
+    assert tuple(type(statement.value) for statement in statements) == (BinOpNode, BinOpNode)
 
-    assert isinstance(statements[0].value, BinOpNode)
-    assert isinstance(statements[1].value, BinOpNode)
-
-    print(" Выражения с переменными не оптимизированы (корректно)")
-
-    return True
-
-def run_all_optimization_tests():
-    print("Запуск тестов оптимизации...")
-
-    tests = [
-        test_constant_folding_arithmetic,
-        test_constant_folding_logical,
-        test_algebraic_optimizations,
-        test_constant_if_optimization,
-        test_constant_while_optimization,
-        test_complex_constant_expression,
-        test_no_optimization_with_variables
-    ]
-
-    passed = 0
-    total = len(tests)
-
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-        except Exception as e:
-            print(f"Тест {test.__name__} провален: {e}")
-
-    print(f"\nРезультат: {passed}/{total} тестов пройдено")
-
-    if passed == total:
-        print("Все тесты оптимизации пройдены!")
-        return True
-    else:
-        print("Некоторые тесты провалены")
-        return False
 
 if __name__ == "__main__":
-    run_all_optimization_tests()
\ No newline at end of file
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -1,16 +1,18 @@
 import sys
 import os
+import traceback
 
 # Настройка кодировки для Windows
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-if 'mel_parser' in sys.modules:
-    del sys.modules['mel_parser']
 
 import mel_parser
-mel_parser._parser = None
+
+# Пересборка парсера с нуля нужна только при проверке сброса его состояния
+if os.environ.get('ALG_TEST_RELOAD_PARSER') == '1':
+    mel_parser.reset_parser()
 
 from mel_parser import parse
 
@@ -40,7 +42,6 @@ def test_simple_assignment():
 
     except Exception as e:
         print(f"Ошибка: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
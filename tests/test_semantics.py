@@ -1,66 +1,43 @@
 import sys
-import os
+from functools import lru_cache
 
-# Настройка кодировки для Windows
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
+import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-from mel_parser import parse
-from semantics import analyze, check_semantics
+from _cache import parse_cached
+from semantics import analyze
 from mel_types import INTEGER, BOOLEAN
 
 
-def test_valid_program():
-    print("=== Тест 1: Валидная программа ===")
-
-    source = '''алг тест_валидный;
+# Общая валидная программа для тестов валидной программы, выражений и функций
+VALID_OMNIBUS_SOURCE = '''алг тест_валидный;
 нач
     а : цел;
     б : цел;
+    в : цел;
     флаг : лог;
+    флаг1 : лог;
+    флаг2 : лог;
+кон
+функции
+    функция сумма(х : цел, у : цел) : цел;
+    нач
+        результат : цел;
+    кон
+        результат := х + у;
+        знач результат;
+    кон
 кон
     а := 10;
     б := а + 5;
     флаг := а > б;
+    б := 20;
+    в := (а + б) * 2 - 5 / 2;  | Арифметическое выражение
+    флаг1 := а > б и б < в;     | Логическое выражение
+    флаг2 := не (а = б);        | Унарная операция
+    а := сумма(а, б);
 кон'''
 
-    try:
-        ast = parse(source)
-        print("Парсинг успешен")
-
-        errors = analyze(ast)
-        if errors:
-            print("Семантические ошибки:")
-            for error in errors:
-                print(f"  - {error}")
-            return False
-        else:
-            print("Семантический анализ прошел успешно!")
-
-
-            var_a = ast.block.var_decls[0]
-            var_b = ast.block.var_decls[1]
-            var_flag = ast.block.var_decls[2]
-
-            print(f"  Переменная 'а': {var_a.type}")
-            print(f"  Переменная 'б': {var_b.type}")
-            print(f"  Переменная 'флаг': {var_flag.type}")
-
-            return True
-
-    except Exception as e:
-        print(f"Ошибка: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def test_type_error():
-    print("\n=== Тест 2: Ошибка типов ===")
-
-    source = '''алг тест_ошибка_типов;
+TYPE_ERROR_SOURCE = '''алг тест_ошибка_типов;
 нач
     а : цел;
     флаг : лог;
@@ -68,58 +45,14 @@ def test_type_error():
     а := да + 1;  | Ошибка: нельзя складывать логическое и целое
 кон'''
 
-    try:
-        ast = parse(source)
-        print("Парсинг успешен")
-
-        errors = analyze(ast)
-        if errors:
-            print("Найдены ожидаемые семантические ошибки:")
-            for error in errors:
-                print(f"  - {error}")
-            return True
-        else:
-            print("Ошибка не найдена - это неправильно!")
-            return False
-
-    except Exception as e:
-        print(f" Неожиданная ошибка: {e}")
-        return False
-
-
-def test_undefined_variable():
-    print("\n=== Тест 3: Неопределенная переменная ===")
-
-    source = '''алг тест_неопределенная;
+UNDEFINED_VARIABLE_SOURCE = '''алг тест_неопределенная;
 нач
     а : цел;
 кон
     а := б + 1;  | Ошибка: 'б' не объявлена
 кон'''
 
-    try:
-        ast = parse(source)
-        print("Парсинг успешен")
-
-        errors = analyze(ast)
-        if errors:
-            print("Найдены ожидаемые ошибки:")
-            for error in errors:
-                print(f"  - {error}")
-            return True
-        else:
-            print("Ошибка не найдена!")
-            return False
-
-    except Exception as e:
-        print(f" Неожиданная ошибка: {e}")
-        return False
-
-
-def test_assignment_compatibility():
-    print("\n=== Тест 4: Совместимость типов при присваивании ===")
-
-    source = '''алг тест_присваивание;
+ASSIGNMENT_MISMATCH_SOURCE = '''алг тест_присваивание;
 нач
     а : цел;
     флаг : лог;
@@ -127,136 +60,82 @@ def test_assignment_compatibility():
     флаг := а;  | Ошибка: нельзя присвоить цел переменной лог
 кон'''
 
-    try:
-        ast = parse(source)
-        print("Парсинг успешен")
-
-        errors = analyze(ast)
-        if errors:
-            print("Найдены ожидаемые ошибки несовместимости типов:")
-            for error in errors:
-                print(f"  - {error}")
-            return True
-        else:
-            print("Ошибка несовместимости типов не найдена!")
-            return False
-
-    except Exception as e:
-        print(f" Неожиданная ошибка: {e}")
-        return False
-
-
-def test_complex_expressions():
-    print("\n=== Тест 5: Сложные выражения ===")
-
-    source = '''алг тест_выражения;
+NESTED_RETURN_SOURCE = '''алг тест_вложенный_возврат;
 нач
     а : цел;
-    б : цел;
-    в : цел;
-    флаг1 : лог;
-    флаг2 : лог;
 кон
-    а := 10;
-    б := 20;
-    в := (а + б) * 2 - 5 / 2;  | Арифметическое выражение
-    флаг1 := а > б и б < в;     | Логическое выражение
-    флаг2 := не (а = б);        | Унарная операция
+функции
+    функция знак(х : цел) : цел;
+    кон
+        если х < 0 то
+            знач 0 - 1;
+        иначе
+            знач 1;
+        все
+    кон
+кон
+    а := знак(5);
 кон'''
 
-    try:
-        ast = parse(source)
-        print("Парсинг успешен")
 
-        errors = analyze(ast)
-        if errors:
-            print("Неожиданные семантические ошибки:")
-            for error in errors:
-                print(f"  - {error}")
-            return False
-        else:
-            print("Сложные выражения прошли семантический анализ!")
-            return True
+# Каждый исходник разбирается и анализируется один раз за процесс, в том числе вне pytest
+@lru_cache(maxsize=None)
+def analyze_source(source: str):
+    ast = parse_cached(source)
+    return ast, analyze(ast)
 
-    except Exception as e:
-        print(f" Неожиданная ошибка: {e}")
-        return False
 
+@pytest.fixture(scope="session")
+def valid_program():
+    # Ошибки анализа, объявления по имени и последнее присваивание каждой переменной
+    ast, errors = analyze_source(VALID_OMNIBUS_SOURCE)
+    decls = {decl.name: decl for decl in ast.block.var_decls + ast.block.func_decls}
+    assigned = {stmt.target.name: stmt.value for stmt in ast.block.statements}
+    return errors, decls, assigned
 
-def test_functions():
-    print("\n=== Тест 6: Функции ===")
 
-    source = '''алг тест_функции;
-нач
-    а : цел;
-    б : цел;
-кон
-функции
-    функция сумма(х : цел, у : цел) : цел;
-    нач
-        результат : цел;
-    кон
-        результат := х + у;
-        знач результат;
-    кон
-кон
-    а := 10;
-    б := 20;
-    а := сумма(а, б);
-кон'''
+def _format_errors(errors) -> str:
+    return "\n".join(f"  - {error}" for error in errors)
+
+
+def test_valid_program(valid_program):
+    errors, decls, _ = valid_program
+    assert not errors, f"Семантические ошибки:\n{_format_errors(errors)}"
+
+    for name, expected in (('а', INTEGER), ('б', INTEGER), ('флаг', BOOLEAN)):
+        assert decls[name].type == expected, f"{name}: {decls[name].type}"
 
-    try:
-        ast = parse(source)
-        print("Парсинг успешен")
 
-        errors = analyze(ast)
-        if errors:
-            print("Семантические ошибки в функциях:")
-            for error in errors:
-                print(f"  - {error}")
-            return False
-        else:
-            print("Функции прошли семантический анализ!")
-            return True
+@pytest.mark.parametrize("source", [
+    pytest.param(TYPE_ERROR_SOURCE, id="type_error"),
+    pytest.param(UNDEFINED_VARIABLE_SOURCE, id="undefined_variable"),
+    pytest.param(ASSIGNMENT_MISMATCH_SOURCE, id="assignment_compatibility"),
+])
+def test_expected_errors(source):
+    _, errors = analyze_source(source)
+    assert errors, "Ожидаемая семантическая ошибка не найдена"
 
-    except Exception as e:
-        print(f" Неожиданная ошибка: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
 
+def test_complex_expressions(valid_program):
+    errors, _, assigned = valid_program
+    assert not errors, f"Неожиданные семантические ошибки:\n{_format_errors(errors)}"
 
-def run_all_tests():
-    print("🧪 ТЕСТИРОВАНИЕ СЕМАНТИЧЕСКОГО АНАЛИЗАТОРА")
-    print("=" * 60)
+    for name, expected in (('в', INTEGER), ('флаг1', BOOLEAN), ('флаг2', BOOLEAN)):
+        assert assigned[name].type == expected, f"{name}: {assigned[name].type}"
 
-    tests = [
-        test_valid_program,
-        test_type_error,
-        test_undefined_variable,
-        test_assignment_compatibility,
-        test_complex_expressions,
-        test_functions
-    ]
 
-    passed = 0
-    total = len(tests)
+def test_functions(valid_program):
+    errors, decls, assigned = valid_program
+    assert not errors, f"Семантические ошибки в функциях:\n{_format_errors(errors)}"
 
-    for test in tests:
-        if test():
-            passed += 1
+    assert [param.type for param in decls['сумма'].params] == [INTEGER, INTEGER]
+    assert assigned['а'].type == INTEGER
 
-    print("\n" + "=" * 60)
-    print(f"РЕЗУЛЬТАТЫ: {passed}/{total} тестов пройдено")
 
-    if passed == total:
-        print(" ВСЕ ТЕСТЫ ПРОЙДЕНЫ! Семантический анализатор работает корректно!")
-        return True
-    else:
-        print(f" {total - passed} тестов не пройдено")
-        return False
+def test_return_in_nested_block():
+    _, errors = analyze_source(NESTED_RETURN_SOURCE)
+    assert not errors, f"Неожиданные семантические ошибки:\n{_format_errors(errors)}"
 
 
 if __name__ == "__main__":
-    success = run_all_tests()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -1,5 +1,6 @@
 import sys
 import os
+import traceback
 
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -10,7 +11,23 @@ print("Тест 1: Простой print")
 
 try:
     print("Тест 2: Импорт json")
-    import json
+    # orjson разбирает и пишет байты целиком на C; без него используется стандартный json
+    try:
+        import orjson
+
+        def load_json(data: bytes):
+            return orjson.loads(data)
+
+        def dump_json(obj) -> bytes:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    except ImportError:
+        import json
+
+        def load_json(data: bytes):
+            return json.loads(data)
+
+        def dump_json(obj) -> bytes:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
     print("JSON импортирован успешно")
     
     print("Тест 3: Чтение файла")
@@ -18,12 +35,12 @@ try:
     if not os.path.exists(test_file):
         print(f"Файл {test_file} не найден, создаем тестовые данные...")
         test_data = {"constants": [], "code": [], "globals_count": 0}
-        with open(test_file, 'w', encoding='utf-8') as f:
-            json.dump(test_data, f, ensure_ascii=False, indent=2)
+        with open(test_file, 'wb') as f:
+            f.write(dump_json(test_data))
         print(f"Создан тестовый файл {test_file}")
     
-    with open(test_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with open(test_file, 'rb') as f:
+        data = load_json(f.read())
     print("Файл прочитан успешно")
     print(f"Размер данных: {len(str(data))}")
     
@@ -34,7 +51,6 @@ try:
     
 except Exception as e:
     print(f"Ошибка: {e}")
-    import traceback
     traceback.print_exc()
 
 print("Тест завершен") 
\ No newline at end of file
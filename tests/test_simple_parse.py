@@ -1,11 +1,17 @@
+import hashlib
 import sys
 import os
+import traceback
 
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+# Таблицы LALR сохраняются между запусками: ключ — хеш текста грамматики
+_LARK_CACHE_DIR = os.path.join(os.path.dirname(__file__), '.lark_cache')
+os.makedirs(_LARK_CACHE_DIR, exist_ok=True)
+
 print("Testing simple parse...")
 
 try:
@@ -20,7 +26,8 @@ try:
     '''
     
     print("Creating parser...")
-    parser = Lark(simple_grammar, start='program', parser='lalr')
+    parser = Lark(simple_grammar, start='program', parser='lalr',
+                  cache=os.path.join(_LARK_CACHE_DIR, hashlib.md5(simple_grammar.encode()).hexdigest() + '.pkl'))
     print("Parser created")
     
     print("Testing parse...")
@@ -39,5 +46,4 @@ try:
     
 except Exception as e:
     print(f"Error: {e}")
-    import traceback
     traceback.print_exc() 
\ No newline at end of file
@@ -1,80 +1,47 @@
+import io
 import sys
-import os
+from contextlib import redirect_stdout
 
-# Настройка кодировки для Windows
-if sys.platform == 'win32':
-    sys.stdout.reconfigure(encoding='utf-8')
+import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-from mel_parser import parse
-from vm_core import *
-from vm_codegen import *
+from _cache import parse_cached, compile_cached
+from vm_core import VMInstruction, VMProgram, VirtualMachine, OpCode
 from interpreter import interpret
 
 
-def test_simple_vm_instructions():
-    print("=== Тест базовых инструкций VM ===")
+@pytest.fixture(scope="session")
+def vm():
+    # run() сбрасывает состояние машины перед каждой программой
+    return VirtualMachine()
 
-    try:
 
-        instructions = [
+INSTRUCTION_CASES = [
+    pytest.param(
+        [
             VMInstruction(OpCode.PUSH_INT, 5),
             VMInstruction(OpCode.PUSH_INT, 3),
             VMInstruction(OpCode.ADD),
             VMInstruction(OpCode.PRINT),
             VMInstruction(OpCode.HALT)
-        ]
-
-        program = VMProgram(constants=[], code=instructions)
-
-        vm = VirtualMachine()
-        output = vm.run(program)
-
-        expected = ["8\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print("Базовые инструкции работают")
-        return True
-
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def test_vm_variables():
-    print("\n=== Тест переменных VM ===")
-
-    try:
-
-        instructions = [
+        ],
+        0,
+        ["8\n"],
+        id="basic",
+    ),
+    pytest.param(
+        [
             VMInstruction(OpCode.PUSH_INT, 10),
             VMInstruction(OpCode.STORE_GLOBAL, 0),
             VMInstruction(OpCode.LOAD_GLOBAL, 0),
             VMInstruction(OpCode.PRINT),
             VMInstruction(OpCode.HALT)
-        ]
-
-        program = VMProgram(constants=[], code=instructions, globals_count=1)
-
-        vm = VirtualMachine()
-        output = vm.run(program)
-
-        expected = ["10\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print("Переменные работают")
-        return True
-
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def test_vm_conditionals():
-    print("\n=== Тест условных переходов VM ===")
-
-    try:
-
-        instructions = [
+        ],
+        1,
+        ["10\n"],
+        id="variables",
+    ),
+    pytest.param(
+        [
             VMInstruction(OpCode.PUSH_INT, 5),
             VMInstruction(OpCode.PUSH_INT, 3),
             VMInstruction(OpCode.GT),
@@ -85,61 +52,34 @@ def test_vm_conditionals():
             VMInstruction(OpCode.PUSH_STRING, "нет"),
             VMInstruction(OpCode.PRINT),
             VMInstruction(OpCode.HALT)
-        ]
-
-        program = VMProgram(constants=[], code=instructions)
+        ],
+        0,
+        ["да\n"],
+        id="conditionals",
+    ),
+]
 
-        vm = VirtualMachine()
-        output = vm.run(program)
 
-        expected = ["да\n"]
-        assert output == expected, f"Ожидается {expected}, получено {output}"
-        print("Условные переходы работают")
-        return True
+@pytest.mark.parametrize("instructions, globals_count, expected", INSTRUCTION_CASES)
+def test_vm_instructions(vm, instructions, globals_count, expected):
+    program = VMProgram(constants=[], code=instructions, globals_count=globals_count)
+    output = vm.run(program)
+    assert output == expected, f"Ожидается {expected}, получено {output}"
 
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
 
-
-def test_codegen_simple():
-    print("\n=== Тест простой кодогенерации ===")
-
-    source = '''алг тест;
+CODEGEN_CASES = [
+    pytest.param(
+        '''алг тест;
 нач
     а : цел;
 кон
     а := 42;
     вывод(а);
-кон'''
-
-    try:
-        ast = parse(source)
-
-
-        program = compile_to_vm(ast)
-
-
-        vm_output = run_vm_program(program)
-
-
-        interpreter_output = interpret(ast)
-
-        assert vm_output == interpreter_output, f"VM: {vm_output}, Interpreter: {interpreter_output}"
-        print("Простая кодогенерация работает")
-        return True
-
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def test_codegen_arithmetic():
-    print("\n=== Тест кодогенерации арифметики ===")
-
-    source = '''алг арифметика;
+кон''',
+        id="simple",
+    ),
+    pytest.param(
+        '''алг арифметика;
 нач
     а : цел;
     б : цел;
@@ -149,35 +89,11 @@ def test_codegen_arithmetic():
     б := 5;
     в := а + б * 2;
     вывод(в);
-кон'''
-
-    try:
-        ast = parse(source)
-
-
-        program = compile_to_vm(ast)
-
-
-        vm_output = run_vm_program(program)
-
-
-        interpreter_output = interpret(ast)
-
-        assert vm_output == interpreter_output, f"VM: {vm_output}, Interpreter: {interpreter_output}"
-        print("Арифметика работает")
-        return True
-
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def test_codegen_conditionals():
-    print("\n=== Тест кодогенерации условий ===")
-
-    source = '''алг условия;
+кон''',
+        id="arithmetic",
+    ),
+    pytest.param(
+        '''алг условия;
 нач
     а : цел;
 кон
@@ -187,70 +103,22 @@ def test_codegen_conditionals():
     иначе
         вывод("меньше");
     все
-кон'''
-
-    try:
-        ast = parse(source)
-
-
-        program = compile_to_vm(ast)
-
-
-        vm_output = run_vm_program(program)
-
-
-        interpreter_output = interpret(ast)
-
-        assert vm_output == interpreter_output, f"VM: {vm_output}, Interpreter: {interpreter_output}"
-        print("Условия работают")
-        return True
-
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def test_codegen_loops():
-    print("\n=== Тест кодогенерации циклов ===")
-
-    source = '''алг циклы;
+кон''',
+        id="conditionals",
+    ),
+    pytest.param(
+        '''алг циклы;
 нач
     i : цел;
 кон
     для i от 1 до 3
         вывод(i);
     кц
-кон'''
-
-    try:
-        ast = parse(source)
-
-
-        program = compile_to_vm(ast)
-
-
-        vm_output = run_vm_program(program)
-
-
-        interpreter_output = interpret(ast)
-
-        assert vm_output == interpreter_output, f"VM: {vm_output}, Interpreter: {interpreter_output}"
-        print("Циклы работают")
-        return True
-
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def test_codegen_builtins():
-    print("\n=== Тест встроенных функций ===")
-
-    source = '''алг встроенные;
+кон''',
+        id="loops",
+    ),
+    pytest.param(
+        '''алг встроенные;
 нач
     а : цел;
 кон
@@ -260,135 +128,60 @@ def test_codegen_builtins():
     умен(а);
     вывод(а);
     вывод(модуль(-5));
-кон'''
-
-    try:
-        ast = parse(source)
-
-
-        program = compile_to_vm(ast)
-
+кон''',
+        id="builtins",
+    ),
+]
 
-        vm_output = run_vm_program(program)
 
+@pytest.mark.parametrize("source", CODEGEN_CASES)
+def test_codegen(vm, source):
+    # Разбор и кодогенерация кэшируются: одно AST на исходник, одна программа на AST
+    ast = parse_cached(source)
+    vm_output = vm.run(compile_cached(ast))
 
+    with redirect_stdout(io.StringIO()):
         interpreter_output = interpret(ast)
 
-        assert vm_output == interpreter_output, f"VM: {vm_output}, Interpreter: {interpreter_output}"
-        print("Встроенные функции работают")
-        return True
-
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-
-
-def test_vm_program_serialization():
-    print("\n=== Тест сериализации программ ===")
-
-    try:
-
-        instructions = [
-            VMInstruction(OpCode.PUSH_INT, 42),
-            VMInstruction(OpCode.PRINT),
-            VMInstruction(OpCode.HALT)
-        ]
-
-        original_program = VMProgram(constants=["hello"], code=instructions, globals_count=1)
-
-
-        data = original_program.to_dict()
-
-
-        restored_program = VMProgram.from_dict(data)
-
+    assert vm_output == interpreter_output, f"VM: {vm_output}, Interpreter: {interpreter_output}"
 
-        assert len(original_program.code) == len(restored_program.code)
-        assert original_program.constants == restored_program.constants
-        assert original_program.globals_count == restored_program.globals_count
 
+def test_vm_program_serialization(vm):
+    instructions = [
+        VMInstruction(OpCode.PUSH_INT, 42),
+        VMInstruction(OpCode.PRINT),
+        VMInstruction(OpCode.HALT)
+    ]
 
-        vm1 = VirtualMachine()
-        output1 = vm1.run(original_program)
-
-        vm2 = VirtualMachine()
-        output2 = vm2.run(restored_program)
-
-        assert output1 == output2
+    original_program = VMProgram(constants=["hello"], code=instructions, globals_count=1)
+    restored_program = VMProgram.from_dict(original_program.to_dict())
 
-        print("Сериализация работает")
-        return True
+    assert len(original_program.code) == len(restored_program.code)
+    assert original_program.constants == restored_program.constants
+    assert original_program.globals_count == restored_program.globals_count
 
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
+    assert vm.run(original_program) == vm.run(restored_program)
 
 
 def test_vm_tracing():
-    print("\n=== Тест трассировки VM ===")
-
-    try:
-
-        instructions = [
-            VMInstruction(OpCode.PUSH_INT, 5),
-            VMInstruction(OpCode.PUSH_INT, 3),
-            VMInstruction(OpCode.ADD),
-            VMInstruction(OpCode.PRINT),
-            VMInstruction(OpCode.HALT)
-        ]
-
-        program = VMProgram(constants=[], code=instructions)
-
-
-        print("Трассировка выполнения:")
-        vm = VirtualMachine(trace=True)
-        output = vm.run(program)
-
-        expected = ["8\n"]
-        assert output == expected
-
-        print("Трассировка работает")
-        return True
-
-    except Exception as e:
-        print(f" Ошибка: {e}")
-        return False
-
-
-def run_all_tests():
-    print(" Запуск тестов виртуальной машины...\n")
-
-    tests = [
-        test_simple_vm_instructions,
-        test_vm_variables,
-        test_vm_conditionals,
-        test_codegen_simple,
-        test_codegen_arithmetic,
-        test_codegen_conditionals,
-        test_codegen_loops,
-        test_codegen_builtins,
-        test_vm_program_serialization,
-        test_vm_tracing
+    instructions = [
+        VMInstruction(OpCode.PUSH_INT, 5),
+        VMInstruction(OpCode.PUSH_INT, 3),
+        VMInstruction(OpCode.ADD),
+        VMInstruction(OpCode.PRINT),
+        VMInstruction(OpCode.HALT)
     ]
 
-    passed = 0
-    total = len(tests)
-
-    for test in tests:
-        if test():
-            passed += 1
+    program = VMProgram(constants=[], code=instructions)
 
-    print(f"\nРезультаты: {passed}/{total} тестов пройдено")
+    # Трассирующая машина печатает каждую инструкцию: вывод перехватывается
+    trace = io.StringIO()
+    with redirect_stdout(trace):
+        output = VirtualMachine(trace=True).run(program)
 
-    if passed == total:
-        print(" Все тесты VM прошли успешно!")
-        return True
-    else:
-        print(" Некоторые тесты не прошли")
-        return False
+    assert output == ["8\n"]
+    assert "ADD" in trace.getvalue()
 
 
 if __name__ == "__main__":
-    run_all_tests()
\ No newline at end of file
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -1,12 +1,13 @@
 import sys
 import os
+import traceback
 
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 import json
-from vm_core import VMProgram, run_vm_program
+from vm_core import VMProgram, VMInstruction, OpCode, run_vm_program
 
 def main():
     print("=== Тест VM ===")
@@ -17,7 +18,6 @@ def main():
         # Создаем тестовый файл если его нет
         if not os.path.exists(avm_file):
             print("Файл hello.avm не найден, создаем тестовую программу...")
-            from vm_core import VMInstruction, OpCode
             
             test_program = VMProgram(
                 constants=["Привет от VM!"],
@@ -61,7 +61,6 @@ def main():
             
     except Exception as e:
         print(f"Ошибка: {e}")
-        import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
@@ -1,12 +1,13 @@
 import sys
 import os
+import traceback
 
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 import json
-from vm_core import VMProgram, run_vm_program
+from vm_core import VMProgram, VMInstruction, OpCode, run_vm_program
 
 print("Тест прямого запуска VM...")
 
@@ -18,7 +19,6 @@ try:
         print(f"Файл {avm_file} не найден, создаем тестовую программу...")
         
         # Создаем простую тестовую программу
-        from vm_core import VMInstruction, OpCode
         
         test_program = VMProgram(
             constants=["Привет от VM!"],
@@ -65,5 +65,4 @@ try:
         
 except Exception as e:
     print(f"Ошибка: {e}")
-    import traceback
     traceback.print_exc() 
\ No newline at end of file
@@ -1,5 +1,6 @@
 import sys
 import os
+import traceback
 
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -37,7 +38,6 @@ try:
     
 except Exception as e:
     print(f"Ошибка импорта: {e}")
-    import traceback
     traceback.print_exc()
 
 print("Тест завершен") 
\ No newline at end of file
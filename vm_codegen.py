@@ -53,12 +53,13 @@ class VMCodeGenerator:
         self.function_info: Dict[str, Dict[str, int]] = {}  # Информация о функциях (количество локальных переменных и параметров)
         self.current_function: Optional[str] = None
 
-    def generate(self, ast: ProgramNode) -> VMProgram:
+    def generate(self, ast: ProgramNode, analyzed: bool = False) -> VMProgram:
 
-        errors = analyze(ast)
-        if errors:
-            error_msg = "; ".join(str(e) for e in errors)
-            raise CodeGenError(f"Семантические ошибки: {error_msg}")
+        if not analyzed:
+            errors = analyze(ast)
+            if errors:
+                error_msg = "; ".join(str(e) for e in errors)
+                raise CodeGenError(f"Семантические ошибки: {error_msg}")
 
 
         self.reset()
@@ -265,8 +266,8 @@ class VMCodeGenerator:
                 return ""
         elif isinstance(type_node, ArrayTypeNode):
 
-            if isinstance(type_node.size, IntLiteralNode):
-                size = type_node.size.value
+            if isinstance(type_node.size, int):
+                size = type_node.size
                 default_elem = self.get_default_value_for_type(type_node.element_type)
                 return [default_elem] * size
 
@@ -745,9 +746,9 @@ class VMCodeGenerator:
             self.emit(OpCode.PUSH_CONST, const_index)
 
 
-def compile_to_vm(ast: ProgramNode) -> VMProgram:
+def compile_to_vm(ast: ProgramNode, analyzed: bool = False) -> VMProgram:
     codegen = VMCodeGenerator()
-    return codegen.generate(ast)
+    return codegen.generate(ast, analyzed)
 
 
 
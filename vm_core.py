@@ -1,6 +1,6 @@
 import json
-from typing import List, Dict, Any, Optional, Union
-from dataclasses import dataclass
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
+from dataclasses import dataclass, field
 from enum import Enum
 from mel_types import *
 
@@ -81,7 +81,7 @@ class OpCode(Enum):
     HALT = "HALT"
 
 
-@dataclass
+@dataclass(slots=True)
 class VMInstruction:
     opcode: OpCode
     arg: Optional[Any] = None
@@ -94,16 +94,34 @@ class VMInstruction:
 
 @dataclass
 class VMProgram:
-    constants: List[Any]
-    code: List[VMInstruction]
+    constants: Tuple[Any, ...]
+    code: Tuple[VMInstruction, ...]
     globals_count: int = 0
+    _cached_dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any):
+        # Код и константы хранятся кортежами: программа не делит списки с генератором кода,
+        # а любое переназначение поля сбрасывает кэш сериализации
+        if name in ("constants", "code"):
+            value = tuple(value)
+        super().__setattr__(name, value)
+        if name != "_cached_dict":
+            super().__setattr__("_cached_dict", None)
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "constants": self.constants,
-            "code": [(instr.opcode.value, instr.arg) for instr in self.code],
-            "globals_count": self.globals_count
-        }
+        # Словарь строится один раз на программу и разделяется вызывающими: изменять его нельзя
+        if self._cached_dict is None:
+            self._cached_dict = {
+                "constants": list(self.constants),
+                "code": [(instr.opcode.value, instr.arg) for instr in self.code],
+                "globals_count": self.globals_count
+            }
+        return self._cached_dict
+
+    def decode(self) -> Tuple[List[OpCode], List[Any]]:
+        # Код раскладывается в два параллельных списка: цикл выборки VM читает коды операций
+        # и аргументы по индексу, не обращаясь к атрибутам объектов инструкций
+        return [instr.opcode for instr in self.code], [instr.arg for instr in self.code]
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'VMProgram':
@@ -140,13 +158,18 @@ class VirtualMachine:
 
     def __init__(self, trace: bool = False):
         self.trace = trace
+        self._dispatch = self._build_dispatch()
+        self.stack: List[Any] = []
+        self.call_stack: List[CallFrame] = []
         self.reset()
 
     def reset(self):
+        # Стек и стек вызовов переиспользуются между запусками одной машины;
+        # вывод каждый раз новый, потому что run() отдаёт его вызывающему
         self.ip = 0
-        self.stack: List[Any] = []
+        self.stack.clear()
         self.globals: List[Any] = []
-        self.call_stack: List[CallFrame] = []
+        self.call_stack.clear()
         self.output: List[str] = []
         self.halted = False
 
@@ -160,9 +183,39 @@ class VirtualMachine:
 
         self.globals = [self.get_default_value()] * program.globals_count
 
+        if not self.trace:
+            kernel = specialize_program(program)
+            if kernel is not None:
+                try:
+                    self.ip, self.halted = kernel(self.globals, self.output, self.format_value)
+                    return self.output.copy()
+                except VMError:
+                    raise
+                except Exception:
+                    # Неожиданная ошибка: повторяем программу на интерпретаторе байткода,
+                    # чтобы получить то же сообщение и номер инструкции
+                    self.reset()
+                    self.program = program
+                    self.globals = [self.get_default_value()] * program.globals_count
+
         try:
-            while not self.halted and self.ip < len(program.code):
-                self.step()
+            if self.trace:
+                while not self.halted and self.ip < len(program.code):
+                    self.step()
+            else:
+                # Без трассировки цикл выборки идёт напрямую по раскодированной программе:
+                # границы проверяет условие цикла, обработчик берётся из локальной переменной
+                opcodes, args = program.decode()
+                code_len = len(opcodes)
+                dispatch = self._dispatch
+                while not self.halted and self.ip < code_len:
+                    ip = self.ip
+                    handler = dispatch.get(opcodes[ip])
+                    if handler is None:
+                        raise VMError(f"Неизвестная инструкция: {opcodes[ip]}")
+                    handler(args[ip])
+                    if not self.halted:
+                        self.ip += 1
 
             return self.output.copy()
 
@@ -189,208 +242,262 @@ class VirtualMachine:
             self.ip += 1
 
     def execute_instruction(self, instruction: VMInstruction):
-        opcode = instruction.opcode
-        arg = instruction.arg
-
-
-        if opcode == OpCode.PUSH_CONST:
-            self.push(self.program.constants[arg])
-        elif opcode == OpCode.PUSH_INT:
-            self.push(arg)
-        elif opcode == OpCode.PUSH_BOOL:
-            self.push(arg)
-        elif opcode == OpCode.PUSH_CHAR:
-            self.push(arg)
-        elif opcode == OpCode.PUSH_STRING:
-            self.push(arg)
-
+        self._execute(instruction.opcode, instruction.arg)
 
-        elif opcode == OpCode.LOAD_GLOBAL:
-            if arg >= len(self.globals):
-                raise VMError(f"Неверный индекс глобальной переменной: {arg}")
-            self.push(self.globals[arg])
-        elif opcode == OpCode.STORE_GLOBAL:
-            if arg >= len(self.globals):
-                raise VMError(f"Неверный индекс глобальной переменной: {arg}")
-            self.globals[arg] = self.pop()
-        elif opcode == OpCode.LOAD_LOCAL:
-            if not self.call_stack:
-                raise VMError("Попытка доступа к локальной переменной вне функции")
-            frame = self.call_stack[-1]
-            if arg >= len(frame.locals):
-                raise VMError(f"Неверный индекс локальной переменной: {arg}")
-            self.push(frame.locals[arg])
-        elif opcode == OpCode.STORE_LOCAL:
-            if not self.call_stack:
-                raise VMError("Попытка доступа к локальной переменной вне функции")
-            frame = self.call_stack[-1]
-            if arg >= len(frame.locals):
-                raise VMError(f"Неверный индекс локальной переменной: {arg}")
-            frame.locals[arg] = self.pop()
-
-
-        elif opcode == OpCode.LOAD_ARRAY:
-            index = self.pop()
-            array = self.pop()
-            if not isinstance(array, list):
-                raise VMError("Попытка индексации не-массива")
-            if not isinstance(index, int) or index < 0 or index >= len(array):
-                raise VMError(f"Неверный индекс массива: {index}")
-            self.push(array[index])
-        elif opcode == OpCode.STORE_ARRAY:
-            value = self.pop()
-            index = self.pop()
-            array = self.pop()
-            if not isinstance(array, list):
-                raise VMError("Попытка индексации не-массива")
-            if not isinstance(index, int) or index < 0 or index >= len(array):
-                raise VMError(f"Неверный индекс массива: {index}")
-            array[index] = value
-
-
-        elif opcode == OpCode.ADD:
-            b, a = self.pop(), self.pop()
-            self.push(a + b)
-        elif opcode == OpCode.SUB:
-            b, a = self.pop(), self.pop()
-            self.push(a - b)
-        elif opcode == OpCode.MUL:
-            b, a = self.pop(), self.pop()
-            self.push(a * b)
-        elif opcode == OpCode.DIV:
-            b, a = self.pop(), self.pop()
-            if b == 0:
-                raise VMError("Деление на ноль")
-            self.push(a // b)
-        elif opcode == OpCode.IDIV:
-            b, a = self.pop(), self.pop()
-            if b == 0:
-                raise VMError("Деление на ноль")
-            self.push(a // b)
-        elif opcode == OpCode.MOD:
-            b, a = self.pop(), self.pop()
-            if b == 0:
-                raise VMError("Деление на ноль")
-            self.push(a % b)
-        elif opcode == OpCode.NEG:
-            a = self.pop()
-            self.push(-a)
-
-
-        elif opcode == OpCode.EQ:
-            b, a = self.pop(), self.pop()
-            self.push(a == b)
-        elif opcode == OpCode.NE:
-            b, a = self.pop(), self.pop()
-            self.push(a != b)
-        elif opcode == OpCode.LT:
-            b, a = self.pop(), self.pop()
-            self.push(a < b)
-        elif opcode == OpCode.LE:
-            b, a = self.pop(), self.pop()
-            self.push(a <= b)
-        elif opcode == OpCode.GT:
-            b, a = self.pop(), self.pop()
-            self.push(a > b)
-        elif opcode == OpCode.GE:
-            b, a = self.pop(), self.pop()
-            self.push(a >= b)
-
-
-        elif opcode == OpCode.AND:
-            b, a = self.pop(), self.pop()
-            self.push(bool(a) and bool(b))
-        elif opcode == OpCode.OR:
-            b, a = self.pop(), self.pop()
-            self.push(bool(a) or bool(b))
-        elif opcode == OpCode.NOT:
-            a = self.pop()
-            self.push(not bool(a))
+    def _execute(self, opcode: OpCode, arg: Any):
+        handler = self._dispatch.get(opcode)
+        if handler is None:
+            raise VMError(f"Неизвестная инструкция: {opcode}")
+        handler(arg)
 
+    def _build_dispatch(self) -> Dict[OpCode, Callable[[Any], None]]:
+        # Таблица переходов: код операции -> связанный метод-обработчик
+        return {
+            OpCode.PUSH_CONST: self._op_push_const,
+            OpCode.PUSH_INT: self._op_push,
+            OpCode.PUSH_BOOL: self._op_push,
+            OpCode.PUSH_CHAR: self._op_push,
+            OpCode.PUSH_STRING: self._op_push,
+
+            OpCode.LOAD_GLOBAL: self._op_load_global,
+            OpCode.STORE_GLOBAL: self._op_store_global,
+            OpCode.LOAD_LOCAL: self._op_load_local,
+            OpCode.STORE_LOCAL: self._op_store_local,
+
+            OpCode.LOAD_ARRAY: self._op_load_array,
+            OpCode.STORE_ARRAY: self._op_store_array,
+
+            OpCode.ADD: self._op_add,
+            OpCode.SUB: self._op_sub,
+            OpCode.MUL: self._op_mul,
+            OpCode.DIV: self._op_div,
+            OpCode.IDIV: self._op_div,
+            OpCode.MOD: self._op_mod,
+            OpCode.NEG: self._op_neg,
+
+            OpCode.EQ: self._op_eq,
+            OpCode.NE: self._op_ne,
+            OpCode.LT: self._op_lt,
+            OpCode.LE: self._op_le,
+            OpCode.GT: self._op_gt,
+            OpCode.GE: self._op_ge,
+
+            OpCode.AND: self._op_and,
+            OpCode.OR: self._op_or,
+            OpCode.NOT: self._op_not,
+
+            OpCode.JMP: self._op_jmp,
+            OpCode.JMP_IF_FALSE: self._op_jmp_if_false,
+            OpCode.JMP_IF_TRUE: self._op_jmp_if_true,
+
+            OpCode.CALL: self._op_call,
+            OpCode.RETURN: self._op_return,
+
+            OpCode.PRINT: self._op_print,
+            OpCode.INC: self._op_inc,
+            OpCode.DEC: self._op_dec,
+            OpCode.ABS: self._op_abs,
+
+            OpCode.POP: self._op_pop,
+            OpCode.DUP: self._op_dup,
+
+            OpCode.NOP: self._op_nop,
+            OpCode.HALT: self._op_halt,
+        }
 
-        elif opcode == OpCode.JMP:
+    def _op_push_const(self, arg: Any):
+        self.push(self.program.constants[arg])
+
+    def _op_push(self, arg: Any):
+        self.push(arg)
+
+    def _op_load_global(self, arg: Any):
+        if arg >= len(self.globals):
+            raise VMError(f"Неверный индекс глобальной переменной: {arg}")
+        self.push(self.globals[arg])
+
+    def _op_store_global(self, arg: Any):
+        if arg >= len(self.globals):
+            raise VMError(f"Неверный индекс глобальной переменной: {arg}")
+        self.globals[arg] = self.pop()
+
+    def _current_locals(self, arg: Any) -> List[Any]:
+        if not self.call_stack:
+            raise VMError("Попытка доступа к локальной переменной вне функции")
+        frame = self.call_stack[-1]
+        if arg >= len(frame.locals):
+            raise VMError(f"Неверный индекс локальной переменной: {arg}")
+        return frame.locals
+
+    def _op_load_local(self, arg: Any):
+        self.push(self._current_locals(arg)[arg])
+
+    def _op_store_local(self, arg: Any):
+        self._current_locals(arg)[arg] = self.pop()
+
+    def _check_array_access(self, array: Any, index: Any):
+        if not isinstance(array, list):
+            raise VMError("Попытка индексации не-массива")
+        if not isinstance(index, int) or index < 0 or index >= len(array):
+            raise VMError(f"Неверный индекс массива: {index}")
+
+    def _op_load_array(self, arg: Any):
+        index = self.pop()
+        array = self.pop()
+        self._check_array_access(array, index)
+        self.push(array[index])
+
+    def _op_store_array(self, arg: Any):
+        value = self.pop()
+        index = self.pop()
+        array = self.pop()
+        self._check_array_access(array, index)
+        array[index] = value
+
+    def _op_add(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(a + b)
+
+    def _op_sub(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(a - b)
+
+    def _op_mul(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(a * b)
+
+    def _op_div(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        if b == 0:
+            raise VMError("Деление на ноль")
+        self.push(a // b)
+
+    def _op_mod(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        if b == 0:
+            raise VMError("Деление на ноль")
+        self.push(a % b)
+
+    def _op_neg(self, arg: Any):
+        a = self.pop()
+        self.push(-a)
+
+    def _op_eq(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(a == b)
+
+    def _op_ne(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(a != b)
+
+    def _op_lt(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(a < b)
+
+    def _op_le(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(a <= b)
+
+    def _op_gt(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(a > b)
+
+    def _op_ge(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(a >= b)
+
+    def _op_and(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(bool(a) and bool(b))
+
+    def _op_or(self, arg: Any):
+        b, a = self.pop(), self.pop()
+        self.push(bool(a) or bool(b))
+
+    def _op_not(self, arg: Any):
+        a = self.pop()
+        self.push(not bool(a))
+
+    def _op_jmp(self, arg: Any):
+        self.ip = arg - 1
+
+    def _op_jmp_if_false(self, arg: Any):
+        condition = self.pop()
+        if not bool(condition):
             self.ip = arg - 1
-        elif opcode == OpCode.JMP_IF_FALSE:
-            condition = self.pop()
-            if not bool(condition):
-                self.ip = arg - 1
-        elif opcode == OpCode.JMP_IF_TRUE:
-            condition = self.pop()
-            if bool(condition):
-                self.ip = arg - 1
-
 
-        elif opcode == OpCode.CALL:
-
-            if len(arg) == 3:
-                func_addr, num_params, total_locals = arg
-            else:
-                # Обратная совместимость
-                func_addr, num_params = arg
-                total_locals = num_params
-            
-            # Извлекаем аргументы из стека
-            args = []
-            for _ in range(num_params):
-                args.append(self.pop())
-            
-            # Дополняем локальные переменные до нужного количества
-            locals_list = args + [self.get_default_value()] * (total_locals - num_params)
-            
-            # Создаем новый фрейм с аргументами как локальными переменными
-            frame = CallFrame(
-                locals=locals_list,
-                return_address=self.ip + 1
-            )
-            self.call_stack.append(frame)
-            self.ip = func_addr - 1
-        elif opcode == OpCode.RETURN:
-            if not self.call_stack:
-
-                self.halted = True
-                return
-            frame = self.call_stack.pop()
-            self.ip = frame.return_address - 1
+    def _op_jmp_if_true(self, arg: Any):
+        condition = self.pop()
+        if bool(condition):
+            self.ip = arg - 1
 
+    def _op_call(self, arg: Any):
+        if len(arg) == 3:
+            func_addr, num_params, total_locals = arg
+        else:
+            # Обратная совместимость
+            func_addr, num_params = arg
+            total_locals = num_params
+
+        # Извлекаем аргументы из стека
+        args = []
+        for _ in range(num_params):
+            args.append(self.pop())
+
+        # Дополняем локальные переменные до нужного количества
+        locals_list = args + [self.get_default_value()] * (total_locals - num_params)
+
+        # Создаем новый фрейм с аргументами как локальными переменными
+        frame = CallFrame(
+            locals=locals_list,
+            return_address=self.ip + 1
+        )
+        self.call_stack.append(frame)
+        self.ip = func_addr - 1
 
-        elif opcode == OpCode.PRINT:
-            value = self.pop()
-            output_str = self.format_value(value)
-            self.output.append(output_str + "\n")
-            if self.trace:
-                print(output_str)
-        elif opcode == OpCode.INC:
+    def _op_return(self, arg: Any):
+        if not self.call_stack:
+            self.halted = True
+            return
+        frame = self.call_stack.pop()
+        self.ip = frame.return_address - 1
+
+    def _op_print(self, arg: Any):
+        value = self.pop()
+        output_str = self.format_value(value)
+        self.output.append(f"{output_str}\n")
+        if self.trace:
+            print(output_str)
 
-            if arg < len(self.globals):
-                self.globals[arg] += 1
-            else:
-                raise VMError(f"Неверный индекс переменной для INC: {arg}")
-        elif opcode == OpCode.DEC:
+    def _op_inc(self, arg: Any):
+        if arg < len(self.globals):
+            self.globals[arg] += 1
+        else:
+            raise VMError(f"Неверный индекс переменной для INC: {arg}")
 
-            if arg < len(self.globals):
-                self.globals[arg] -= 1
-            else:
-                raise VMError(f"Неверный индекс переменной для DEC: {arg}")
-        elif opcode == OpCode.ABS:
-            a = self.pop()
-            self.push(abs(a))
+    def _op_dec(self, arg: Any):
+        if arg < len(self.globals):
+            self.globals[arg] -= 1
+        else:
+            raise VMError(f"Неверный индекс переменной для DEC: {arg}")
 
+    def _op_abs(self, arg: Any):
+        a = self.pop()
+        self.push(abs(a))
 
-        elif opcode == OpCode.POP:
-            self.pop()
-        elif opcode == OpCode.DUP:
-            value = self.pop()
-            self.push(value)
-            self.push(value)
+    def _op_pop(self, arg: Any):
+        self.pop()
 
+    def _op_dup(self, arg: Any):
+        value = self.pop()
+        self.push(value)
+        self.push(value)
 
-        elif opcode == OpCode.NOP:
-            pass
-        elif opcode == OpCode.HALT:
-            self.halted = True
+    def _op_nop(self, arg: Any):
+        pass
 
-        else:
-            raise VMError(f"Неизвестная инструкция: {opcode}")
+    def _op_halt(self, arg: Any):
+        self.halted = True
 
     def push(self, value: Any):
         self.stack.append(value)
@@ -430,6 +537,199 @@ class VirtualMachine:
         }
 
 
+# Специализация программ во время выполнения: программа без вызовов функций, локальных
+# переменных и массивов переводится в Python-функцию, где каждый базовый блок -
+# прямолинейный код, а стек живёт в локальных переменных
+
+_BINARY_EXPRESSIONS = {
+    OpCode.ADD: "{a} + {b}",
+    OpCode.SUB: "{a} - {b}",
+    OpCode.MUL: "{a} * {b}",
+    OpCode.EQ: "{a} == {b}",
+    OpCode.NE: "{a} != {b}",
+    OpCode.LT: "{a} < {b}",
+    OpCode.LE: "{a} <= {b}",
+    OpCode.GT: "{a} > {b}",
+    OpCode.GE: "{a} >= {b}",
+    OpCode.AND: "bool({a}) and bool({b})",
+    OpCode.OR: "bool({a}) or bool({b})",
+}
+
+_CHECKED_DIVISIONS = {
+    OpCode.DIV: "{a} // {b}",
+    OpCode.IDIV: "{a} // {b}",
+    OpCode.MOD: "{a} % {b}",
+}
+
+_UNARY_EXPRESSIONS = {
+    OpCode.NEG: "-{a}",
+    OpCode.NOT: "not bool({a})",
+    OpCode.ABS: "abs({a})",
+}
+
+_PUSH_OPCODES = (OpCode.PUSH_INT, OpCode.PUSH_BOOL, OpCode.PUSH_CHAR, OpCode.PUSH_STRING)
+_JUMP_OPCODES = (OpCode.JMP, OpCode.JMP_IF_FALSE, OpCode.JMP_IF_TRUE)
+_STOP_OPCODES = (OpCode.HALT, OpCode.RETURN)
+
+_specialized_cache: Dict[Any, Any] = {}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def specialize_program(program: VMProgram):
+    """Возвращает функцию kernel(globals, output, format_value) -> (ip, halted) или None."""
+    try:
+        key = (tuple((instr.opcode, instr.arg) for instr in program.code),
+               tuple(program.constants), program.globals_count)
+        hash(key)
+    except TypeError:
+        return None
+
+    if key not in _specialized_cache:
+        try:
+            _specialized_cache[key] = _build_kernel(program)
+        except _Unsupported:
+            _specialized_cache[key] = None
+    return _specialized_cache[key]
+
+
+def _build_kernel(program: VMProgram):
+    code = program.code
+    size = len(code)
+
+    leaders = {0}
+    for ip, instr in enumerate(code):
+        if instr.opcode in _JUMP_OPCODES:
+            if not isinstance(instr.arg, int) or instr.arg < 0:
+                raise _Unsupported()
+            leaders.add(instr.arg)
+            leaders.add(ip + 1)
+        elif instr.opcode in _STOP_OPCODES:
+            leaders.add(ip + 1)
+    starts = sorted(leader for leader in leaders if leader < size)
+
+    values = []
+    lines = ["def kernel(g, out, fmt):", "    ip = 0", "    while True:"]
+    keyword = "if"
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else size
+        lines.append(f"        {keyword} ip == {start}:")
+        lines.extend("            " + line for line in _translate_block(program, start, end, values))
+        keyword = "elif"
+    lines.append("        else:")
+    lines.append("            return ip, False")
+
+    namespace = {"VMError": VMError, "values": tuple(values)}
+    exec(compile("\n".join(lines), "<vm-kernel>", "exec"), namespace)
+    return namespace["kernel"]
+
+
+def _translate_block(program: VMProgram, start: int, end: int, values: List[Any]) -> List[str]:
+    stack: List[str] = []
+    lines: List[str] = []
+    literals: Dict[str, Any] = {}
+    temps = 0
+
+    def push(expression: str):
+        nonlocal temps
+        name = f"s{temps}"
+        temps += 1
+        lines.append(f"{name} = {expression}")
+        stack.append(name)
+
+    def pop() -> str:
+        if not stack:
+            raise _Unsupported()
+        return stack.pop()
+
+    def constant(value: Any) -> str:
+        values.append(value)
+        return f"values[{len(values) - 1}]"
+
+    def check_global(index: Any):
+        if not isinstance(index, int) or not 0 <= index < program.globals_count:
+            raise _Unsupported()
+
+    for ip in range(start, end):
+        instr = program.code[ip]
+        opcode, arg = instr.opcode, instr.arg
+
+        if opcode == OpCode.PUSH_CONST:
+            if not isinstance(arg, int) or not 0 <= arg < len(program.constants):
+                raise _Unsupported()
+            push(constant(program.constants[arg]))
+            literals[stack[-1]] = program.constants[arg]
+        elif opcode in _PUSH_OPCODES:
+            push(constant(arg))
+            literals[stack[-1]] = arg
+        elif opcode == OpCode.LOAD_GLOBAL:
+            check_global(arg)
+            push(f"g[{arg}]")
+        elif opcode == OpCode.STORE_GLOBAL:
+            check_global(arg)
+            lines.append(f"g[{arg}] = {pop()}")
+        elif opcode in _BINARY_EXPRESSIONS:
+            b, a = pop(), pop()
+            push(_BINARY_EXPRESSIONS[opcode].format(a=a, b=b))
+        elif opcode in _CHECKED_DIVISIONS:
+            b, a = pop(), pop()
+            lines.append(f"if {b} == 0: raise VMError('Деление на ноль')")
+            push(_CHECKED_DIVISIONS[opcode].format(a=a, b=b))
+        elif opcode in _UNARY_EXPRESSIONS:
+            push(_UNARY_EXPRESSIONS[opcode].format(a=pop()))
+        elif opcode in (OpCode.INC, OpCode.DEC):
+            check_global(arg)
+            lines.append(f"g[{arg}] {'+=' if opcode == OpCode.INC else '-='} 1")
+        elif opcode == OpCode.PRINT:
+            operand = pop()
+            if isinstance(literals.get(operand), str):
+                # Строковый литерал выводится готовой строкой с переводом строки
+                text = literals[operand] + "\n"
+                lines.append(f"out.append({constant(text)})")
+            else:
+                lines.append(f"out.append(f'{{fmt({operand})}}\\n')")
+        elif opcode == OpCode.POP:
+            pop()
+        elif opcode == OpCode.DUP:
+            stack.append(stack[-1] if stack else pop())
+        elif opcode == OpCode.NOP:
+            pass
+        elif opcode in _STOP_OPCODES:
+            # Вне функции RETURN останавливает машину так же, как HALT
+            if stack:
+                raise _Unsupported()
+            lines.append(f"return {ip}, True")
+            return lines
+        elif opcode == OpCode.JMP:
+            if stack:
+                raise _Unsupported()
+            lines.append(f"ip = {arg}")
+            lines.append("continue")
+            return lines
+        elif opcode in (OpCode.JMP_IF_FALSE, OpCode.JMP_IF_TRUE):
+            condition = pop()
+            if stack:
+                raise _Unsupported()
+            negation = "not " if opcode == OpCode.JMP_IF_FALSE else ""
+            lines.append(f"if {negation}{condition}:")
+            lines.append(f"    ip = {arg}")
+            lines.append("    continue")
+            lines.append(f"ip = {ip + 1}")
+            lines.append("continue")
+            return lines
+        else:
+            raise _Unsupported()
+
+    # Переход в следующий блок без явного перехода: стек на границе блоков должен быть пуст
+    if stack:
+        raise _Unsupported()
+    lines.append(f"ip = {end}")
+    lines.append("continue")
+    return lines
+
+
 def run_vm_program(program: VMProgram, trace: bool = False) -> List[str]:
     vm = VirtualMachine(trace=trace)
     return vm.run(program)
@@ -438,5 +738,5 @@ def run_vm_program(program: VMProgram, trace: bool = False) -> List[str]:
 
 __all__ = [
     'VMError', 'OpCode', 'VMInstruction', 'VMProgram', 'CallFrame',
-    'VirtualMachine', 'run_vm_program'
+    'VirtualMachine', 'run_vm_program', 'specialize_program'
 ]